@@ -0,0 +1,227 @@
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from typing import Callable
+
+# headless, this has to happen before pygame starts up
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+# the game prints as it loads, keep stdout for the results
+with contextlib.redirect_stdout(sys.stderr):
+    import core.setup  # noqa: F401 (the window has to exist before assets are converted)
+    from components.distance import DistanceField, distance_field_raycast
+    from components.entities.patrol import PatrolEnemy
+    from components.entities.security_camera import SecurityCameraEnemy
+    from components.ray import (
+        SightData,
+        _grid_raycast,
+        _sight_rays,
+        _sight_steps,
+        sight_collides,
+        sight_compile,
+    )
+    from components.statemachine import StateMachine
+    from scenes.scenemapping import SCENE_MAPPING, SceneState
+
+# times the sight cones of every patrol and security camera in the level, on their own rather
+# than through the game loop, so ray engines can be compared on the same cones.
+# run from src/ like main.py, e.g. python3 benchmark.py --output sight.json
+
+
+# cells looked up by the grid raycasts
+class _CountingSet(set):
+    lookups = 0
+
+    def __contains__(self, item) -> bool:
+        self.lookups += 1
+        return super().__contains__(item)
+
+
+# cells looked up by the distance field raycast
+class _CountingDict(dict):
+    lookups = 0
+
+    def get(self, key, default=None):
+        self.lookups += 1
+        return super().get(key, default)
+
+
+def _sight_center(entity: PatrolEnemy | SecurityCameraEnemy) -> pygame.Vector2:
+    if isinstance(entity, PatrolEnemy):
+        return entity.motion.position + pygame.Vector2(16, 16)
+    return entity.motion.position + pygame.Vector2(8, 8)
+
+
+# the grid arguments the entity passes to sight_compile in game
+def _compile_args(
+    entity: PatrolEnemy | SecurityCameraEnemy,
+    grid_collision: set[tuple[int, int]],
+    grid_distance: DistanceField,
+) -> tuple:
+    if isinstance(entity, SecurityCameraEnemy) and not entity.should_raycast:
+        return ()
+    return (grid_collision, grid_distance)
+
+
+# every ray engine, each taking the cone and the grid to cast into, returning the depths
+def _engines() -> dict[str, Callable]:
+    def grid(data: SightData, grid_collision: set, grid_distance: DistanceField) -> list[float]:
+        segs, steps, start_step = _sight_steps(data)
+        center = data.center + pygame.Vector2(0, data.z_offset)
+        return [
+            _grid_raycast(ray, center, grid_collision, steps, start_step)
+            for ray in _sight_rays(data, segs)
+        ]
+
+    def distance(data: SightData, grid_collision: set, grid_distance: DistanceField) -> list[float]:
+        segs, steps, start_step = _sight_steps(data)
+        center = data.center + pygame.Vector2(0, data.z_offset)
+        start = float(min(start_step, steps)) / steps
+        return [
+            distance_field_raycast(grid_distance, center, ray, start)
+            for ray in _sight_rays(data, segs)
+        ]
+
+    return {"grid": grid, "distance": distance}
+
+
+# player positions on a square grid over the cone's circle
+def _player_positions(data: SightData, count: int) -> list[tuple[float, float]]:
+    positions = []
+    for y in range(count):
+        for x in range(count):
+            positions.append(
+                (
+                    data.center.x + data.radius * (x / max(count - 1, 1) * 2 - 1),
+                    data.center.y + data.radius * (y / max(count - 1, 1) * 2 - 1),
+                )
+            )
+    return positions
+
+
+def _time(func: Callable, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start) / repeats
+
+
+def benchmark_entity(
+    entity: PatrolEnemy | SecurityCameraEnemy,
+    grid_collision: set[tuple[int, int]],
+    grid_distance: DistanceField,
+    facings: int,
+    positions: int,
+    repeats: int,
+) -> dict:
+    data = SightData(
+        entity.sight_data.radius,
+        entity.sight_data.angle,
+        entity.sight_data.z_offset,
+        _sight_center(entity),
+    )
+    counting_collision = _CountingSet(grid_collision)
+    counting_distance = DistanceField(_CountingDict(grid_distance.distances))
+    args = _compile_args(entity, grid_collision, grid_distance)
+    engines = _engines()
+    compile_time = 0
+    collides_time = 0
+    seen = 0
+    engine_results = {name: {"seconds": 0, "ray_steps": 0} for name in engines}
+    for i in range(facings):
+        data.facing = 360 * i / facings
+        for name, engine in engines.items():
+            result = engine_results[name]
+            result["seconds"] += _time(lambda: engine(data, grid_collision, grid_distance), repeats)
+            counting_collision.lookups = 0
+            counting_distance.distances.lookups = 0
+            engine(data, counting_collision, counting_distance)
+            result["ray_steps"] += counting_collision.lookups + counting_distance.distances.lookups
+
+        compile_time += _time(lambda: sight_compile(data, *args), repeats)
+        points = _player_positions(data, positions)
+        collides_time += _time(lambda: [sight_collides(data, p) for p in points], repeats) / len(
+            points
+        )
+        seen += sum(bool(sight_collides(data, p)) for p in points)
+
+    segs = _sight_steps(data)[0]
+    return {
+        "type": type(entity).__name__,
+        "position": [entity.motion.position.x, entity.motion.position.y],
+        "radius": data.radius,
+        "angle": data.angle,
+        "z_offset": data.z_offset,
+        "rays": segs,
+        "raycast": len(args) > 0,
+        "sight_compile_us": compile_time / facings * 1e6,
+        "sight_collides_us": collides_time / facings * 1e6,
+        "player_positions_seen": seen,
+        "engines": {
+            name: {
+                "cast_us": result["seconds"] / facings * 1e6,
+                "ray_steps": result["ray_steps"] / facings,
+            }
+            for name, result in engine_results.items()
+        },
+    }
+
+
+# sums over every entity, so each timing is one call on every cone, e.g. sight_collides_us is
+# testing one player position against all of them
+def benchmark_aggregate(entities: list[dict]) -> dict:
+    aggregate = {
+        "entities": len(entities),
+        "rays": sum(e["rays"] for e in entities),
+        "sight_compile_us": sum(e["sight_compile_us"] for e in entities),
+        "sight_collides_us": sum(e["sight_collides_us"] for e in entities),
+        "engines": {},
+    }
+    for name in entities[0]["engines"] if len(entities) > 0 else []:
+        aggregate["engines"][name] = {
+            "cast_us": sum(e["engines"][name]["cast_us"] for e in entities),
+            "ray_steps": sum(e["engines"][name]["ray_steps"] for e in entities),
+        }
+    return aggregate
+
+
+def run(facings: int, positions: int, repeats: int) -> dict:
+    # the game scene loads assets/default_level.json with its editor
+    with contextlib.redirect_stdout(sys.stderr):
+        game = SCENE_MAPPING[SceneState.GAME](StateMachine())
+    entities = [
+        benchmark_entity(
+            entity, game.grid_collision, game.grid_distance, facings, positions, repeats
+        )
+        for entity in game.entities
+        if isinstance(entity, (PatrolEnemy, SecurityCameraEnemy))
+    ]
+    return {
+        "facings": facings,
+        "player_positions": positions * positions,
+        "repeats": repeats,
+        "entities": entities,
+        "aggregate": benchmark_aggregate(entities),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="benchmark sight cones in the default level")
+    parser.add_argument("--facings", type=int, default=24, help="facings swept per cone")
+    parser.add_argument("--positions", type=int, default=9, help="player positions per side")
+    parser.add_argument("--repeats", type=int, default=5, help="runs averaged per timing")
+    parser.add_argument("--output", help="write the json here rather than to stdout")
+    args = parser.parse_args()
+    results = json.dumps(run(args.facings, args.positions, args.repeats), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(results)
+    else:
+        print(results)
@@ -0,0 +1,146 @@
+import argparse
+import contextlib
+import os
+import sys
+
+# headless, this has to happen before pygame starts up
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+# the game prints as it loads, keep stdout for the results
+with contextlib.redirect_stdout(sys.stderr):
+    import core.setup  # noqa: F401 (the window has to exist before assets are converted)
+    import core.constants as c
+    from components.mesh import CollisionMesh, collision_mesh_build, collision_mesh_initialise
+    from components.motion import motion_update
+    from components.player import Player, _player_collision, player_rect
+    from components.spatial import SpatialGrid, spatial_grid_initialise, spatial_grid_insert
+
+# fires the player at thin walls, free-form and grid, at many speeds and frame lengths and
+# checks it never ends up in or through one, then starts it stuck in a wide merged grid rect and
+# checks it's pushed out the short way. exits with 1 if either goes wrong.
+# run from src/ like main.py, e.g. python3 collision_check.py --max-speed 5000
+
+DIRECTIONS = [(1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, -1), (1, -1), (-1, 1)]
+FRAME_LENGTHS = [1 / 120, 1 / 60, 1 / 30, 1 / 15, 1 / 10]
+# tiles in the merged rect a player starts stuck in
+STUCK_WIDTH = 8
+
+
+# a one pixel wide free-form wall, or a single grid cell, straddling the player's path
+def _thin_wall(kind: str, dx: int, dy: int) -> pygame.Rect:
+    if kind == "grid":
+        return pygame.Rect(0, 0, c.TILE_SIZE, c.TILE_SIZE)
+    if dx != 0:
+        return pygame.Rect(0, -c.TILE_SIZE * 4, 1, c.TILE_SIZE * 9)
+    return pygame.Rect(-c.TILE_SIZE * 4, 0, c.TILE_SIZE * 9, 1)
+
+
+def _world(kind: str, wall: pygame.Rect) -> tuple[CollisionMesh, SpatialGrid]:
+    collision_mesh = CollisionMesh()
+    collision_mesh_initialise(collision_mesh)
+    wall_grid = SpatialGrid()
+    spatial_grid_initialise(wall_grid)
+    if kind == "grid":
+        cells = {
+            (x, y)
+            for x in range(wall.left // c.TILE_SIZE, wall.right // c.TILE_SIZE)
+            for y in range(wall.top // c.TILE_SIZE, wall.bottom // c.TILE_SIZE)
+        }
+        collision_mesh_build(collision_mesh, cells)
+    else:
+        spatial_grid_insert(wall_grid, wall, wall)
+    return collision_mesh, wall_grid
+
+
+# whether moving from before to after, x first then y like the player does, went into wall
+def _passes_through(before: pygame.Rect, after: pygame.Rect, wall: pygame.Rect) -> bool:
+    across = before.move(after.x - before.x, 0)
+    return before.union(across).colliderect(wall) or across.union(after).colliderect(wall)
+
+
+# whether the player, fired from well before the wall, never gets into or through it
+def check_shot(kind: str, dx: int, dy: int, speed: float, dt: float) -> bool:
+    wall = _thin_wall(kind, dx, dy)
+    collision_mesh, wall_grid = _world(kind, wall)
+    player = Player()
+    # start a few frames away, centred on the wall, moving straight at it
+    distance = max(speed * dt * 3, c.TILE_SIZE * 2)
+    start = pygame.Vector2(wall.center) - pygame.Vector2(dx, dy).normalize() * distance
+    player.motion.position = start - pygame.Vector2(player_rect(player.motion).center)
+    velocity = pygame.Vector2(dx, dy).normalize() * speed
+    for _ in range(int(distance * 2 / (speed * dt)) + 2):
+        before = player_rect(player.motion)
+        # the velocity is set every frame like _player_movement does
+        player.motion.velocity = velocity.copy()
+        _player_collision(player, dt, collision_mesh, wall_grid)
+        motion_update(player.motion, dt)
+        if _passes_through(before, player_rect(player.motion), wall):
+            return False
+    return True
+
+
+# whether the player, starting depth px into one end of a wide merged grid rect, is pushed out
+# the short way before it moves on, rather than out the rect's far end
+def check_stuck(side: int, depth: int, dx: int, dy: int, dt: float) -> bool:
+    wall = pygame.Rect(0, 0, c.TILE_SIZE * STUCK_WIDTH, c.TILE_SIZE)
+    collision_mesh, wall_grid = _world("grid", wall)
+    player = Player()
+    prect = player_rect(player.motion)
+    x = wall.left + depth - prect.w if side < 0 else wall.right - depth
+    player.motion.position += pygame.Vector2(x, wall.centery - prect.h // 2) - prect.topleft
+    before = player_rect(player.motion)
+    player.motion.velocity = pygame.Vector2(dx, dy).normalize() * player.walk_speed
+    _player_collision(player, dt, collision_mesh, wall_grid)
+    motion_update(player.motion, dt)
+    after = player_rect(player.motion)
+    moved = pygame.Vector2(after.center) - pygame.Vector2(before.center)
+    return not after.colliderect(wall) and moved.length() <= depth + player.walk_speed * dt + 1
+
+
+def run(max_speed: int, speed_step: int) -> list[dict]:
+    failures = []
+    for kind in ("wall", "grid"):
+        for dx, dy in DIRECTIONS:
+            for speed in range(speed_step, max_speed + 1, speed_step):
+                for dt in FRAME_LENGTHS:
+                    if not check_shot(kind, dx, dy, speed, dt):
+                        failures.append(
+                            {"kind": kind, "direction": (dx, dy), "speed": speed, "dt": dt}
+                        )
+    return failures
+
+
+def run_stuck() -> list[dict]:
+    failures = []
+    width = player_rect(Player().motion).w
+    for side in (-1, 1):
+        for depth in range(1, width + 1):
+            for dx, dy in DIRECTIONS:
+                for dt in FRAME_LENGTHS:
+                    if not check_stuck(side, depth, dx, dy, dt):
+                        failures.append(
+                            {"side": side, "depth": depth, "direction": (dx, dy), "dt": dt}
+                        )
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="check the player can't pass through walls")
+    parser.add_argument("--max-speed", type=int, default=5000, help="fastest shot in px/s")
+    parser.add_argument("--speed-step", type=int, default=50, help="px/s between shots")
+    args = parser.parse_args()
+    failures = run(args.max_speed, args.speed_step)
+    shots = 2 * len(DIRECTIONS) * (args.max_speed // args.speed_step) * len(FRAME_LENGTHS)
+    for failure in failures:
+        print("passed through", failure)
+    print(f"{shots - len(failures)}/{shots} shots stopped")
+    stuck_failures = run_stuck()
+    stuck = 2 * player_rect(Player().motion).w * len(DIRECTIONS) * len(FRAME_LENGTHS)
+    for failure in stuck_failures:
+        print("pushed too far", failure)
+    print(f"{stuck - len(stuck_failures)}/{stuck} stuck players freed")
+    sys.exit(1 if len(failures) + len(stuck_failures) > 0 else 0)
@@ -6,6 +6,8 @@ import core.assets as a
 import core.constants as c
 import core.globals as g
 from components.camera import Camera, camera_to_screen_shake, camera_to_screen_shake_rect
+from components.render import RenderQueue, render_queue_blit, render_queue_surface
+from components.spatial import SpatialGrid, spatial_grid_initialise, spatial_grid_insert
 from scenes.scene import PLAYER_OR_FG, RenderLayer
 
 
@@ -27,20 +29,21 @@ def decor_from_json(js: dict[str, Any]) -> Decor:
     return Decor(pygame.Vector2(js["pos"]), js.get("sprite", 0))
 
 
-def decor_render(
-    dec: Decor, surface: pygame.Surface, camera: Camera, layer: RenderLayer, time: float
-):
+def decor_grid_build(grid: SpatialGrid, decor: list[Decor]) -> None:
+    spatial_grid_initialise(grid)
+    for dec in decor:
+        spatial_grid_insert(grid, dec, decor_rect(dec))
+
+
+def decor_render(dec: Decor, queue: RenderQueue, camera: Camera, layer: RenderLayer, time: float):
     # offset the animation based on position to make it not look super repetitive
     idx = (time + dec.position.x * 0.003 + dec.position.y * 0.002) // 0.1
-    frames = a.DECOR[dec.sprite_index]
+    frames = a.DECOR_FADED[dec.sprite_index] if layer in PLAYER_OR_FG else a.DECOR[dec.sprite_index]
     frame = frames[int(idx % len(frames))]
-    if layer in PLAYER_OR_FG:
-        frame = frame.copy()
-        frame.set_alpha(96)
-    surface.blit(frame, camera_to_screen_shake(camera, *dec.position))
+    render_queue_blit(queue, frame, camera_to_screen_shake(camera, *dec.position))
     if g.show_hitboxes:
         pygame.draw.rect(
-            surface,
+            render_queue_surface(queue),
             c.GREEN,
             camera_to_screen_shake_rect(camera, *decor_rect(dec)),
             1,
@@ -0,0 +1,97 @@
+from dataclasses import dataclass
+from math import ceil, floor
+import pygame
+
+import core.constants as c
+
+DISTANCE_FIELD_MAX = 8  # cells at least this far from anything solid aren't stored
+
+
+# chebyshev distance (in cells) from each cell to the nearest solid one in grid_collision.
+# a cell at distance d has nothing solid in the square of cells d - 1 around it, so rays can
+# skip straight across that square
+@dataclass
+class DistanceField:
+    distances: dict[tuple[int, int], int] = None  # missing cells are DISTANCE_FIELD_MAX or more
+
+
+def _distance_at(grid_collision: set[tuple[int, int]], x: int, y: int) -> int:
+    for r in range(DISTANCE_FIELD_MAX):
+        for i in range(-r, r + 1):
+            if (
+                (x + i, y - r) in grid_collision
+                or (x + i, y + r) in grid_collision
+                or (x - r, y + i) in grid_collision
+                or (x + r, y + i) in grid_collision
+            ):
+                return r
+    return DISTANCE_FIELD_MAX
+
+
+def distance_field_initialise(field: DistanceField) -> None:
+    field.distances = {}
+
+
+# call whenever grid_collision is replaced or changed in bulk
+def distance_field_build(field: DistanceField, grid_collision: set[tuple[int, int]]) -> None:
+    # grow outwards from every solid cell a ring at a time
+    field.distances = {cell: 0 for cell in grid_collision}
+    frontier = list(grid_collision)
+    for r in range(1, DISTANCE_FIELD_MAX):
+        ring = []
+        for x, y in frontier:
+            for dy in (-1, 0, 1):
+                for dx in (-1, 0, 1):
+                    cell = (x + dx, y + dy)
+                    if cell not in field.distances:
+                        field.distances[cell] = r
+                        ring.append(cell)
+        frontier = ring
+
+
+# call after the cell at (grid_x, grid_y) is added to or removed from grid_collision
+def distance_field_update(
+    field: DistanceField, grid_collision: set[tuple[int, int]], grid_x: int, grid_y: int
+) -> None:
+    reach = DISTANCE_FIELD_MAX - 1
+    for y in range(grid_y - reach, grid_y + reach + 1):
+        for x in range(grid_x - reach, grid_x + reach + 1):
+            distance = _distance_at(grid_collision, x, y)
+            if distance < DISTANCE_FIELD_MAX:
+                field.distances[(x, y)] = distance
+            else:
+                field.distances.pop((x, y), None)
+
+
+# fraction along vec, from start onwards, where the ray from origin first enters a solid cell,
+# or 1 if it doesn't
+def distance_field_raycast(
+    field: DistanceField, origin: pygame.Vector2, vec: pygame.Vector2, start: float
+) -> float:
+    size = c.TILE_SIZE
+    ox, oy, vx, vy = origin.x, origin.y, vec.x, vec.y
+    get = field.distances.get
+    t = start
+    while t < 1:
+        x, y = ox + vx * t, oy + vy * t
+        # cell the ray is in, or heading into when it's exactly on an edge
+        cell_x = floor(x / size) if vx >= 0 else ceil(x / size) - 1
+        cell_y = floor(y / size) if vy >= 0 else ceil(y / size) - 1
+        distance = get((cell_x, cell_y), DISTANCE_FIELD_MAX)
+        if distance == 0:
+            return t
+        # leave the empty square around this cell (or just this cell)
+        r = distance - 1 if distance > 1 else 0
+        if vx > 0:
+            t_exit = ((cell_x + r + 1) * size - ox) / vx
+        elif vx < 0:
+            t_exit = ((cell_x - r) * size - ox) / vx
+        else:
+            t_exit = 1
+        if vy > 0:
+            t_exit = min(t_exit, ((cell_y + r + 1) * size - oy) / vy)
+        elif vy < 0:
+            t_exit = min(t_exit, ((cell_y - r) * size - oy) / vy)
+        # float error can leave the ray just short of the edge, so always make progress
+        t = t_exit if t_exit > t else t + 1e-9
+    return 1
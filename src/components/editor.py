@@ -10,10 +10,29 @@ import core.assets as a
 import core.constants as c
 import core.input as t
 import core.globals as g
-from components.decor import Decor, decor_from_json, decor_rect, decor_to_json
+from components.decor import Decor, decor_from_json, decor_grid_build, decor_rect, decor_to_json
+from components.distance import distance_field_build, distance_field_update
 from components.entities.all import ENTITY_CLASSES, entity_from_json
-from components.entities.entity import Entity, render_path
-from components.tile import TileData, tile_render, tile_render_hitbox
+from components.entities.entity import (
+    Entity,
+    entity_collision_changed,
+    entity_grid_build,
+    entity_grid_rect,
+    entity_hazards,
+    render_path,
+)
+from components.hazard import hazard_map_build
+from components.mesh import collision_mesh_build, collision_mesh_update
+from components.render import render_queue_flush
+from components.spatial import (
+    spatial_grid_insert,
+    spatial_grid_move,
+    spatial_grid_query,
+    spatial_grid_remove,
+    spatial_grid_replace,
+)
+from components.terrain import terrain_cache_invalidate, terrain_cache_rebuild
+from components.tile import TileData, tile_render, tile_render_hitbox, wall_grid_build
 from components.camera import (
     Camera,
     camera_from_screen,
@@ -76,6 +95,12 @@ def _ceil_point(vec: pygame.Vector2, upscale=True) -> pygame.Vector2:
     return vec
 
 
+# let everything that depends on grid_collision know it changed within rect
+def _collision_changed(scene: Scene, rect: pygame.Rect) -> None:
+    for entity in scene.entities:
+        entity_collision_changed(entity, rect)
+
+
 def _nudge_region(scene: Scene, old_region: pygame.Rect, tdx: float, tdy: float) -> None:
     dx, dy = tdx * c.TILE_SIZE, tdy * c.TILE_SIZE
     vec = pygame.Vector2(dx, dy)
@@ -105,15 +130,22 @@ def _nudge_region(scene: Scene, old_region: pygame.Rect, tdx: float, tdy: float)
             if old_id in scene.grid_collision:
                 scene.grid_collision.remove(old_id)
                 scene.grid_collision.add(new_id)
+    distance_field_build(scene.grid_distance, scene.grid_collision)
+    collision_mesh_build(scene.collision_mesh, scene.grid_collision)
+    _collision_changed(scene, old_region.union(new_region))
+    terrain_cache_rebuild(scene.terrain_cache, scene.grid_tiles)
     for wall in scene.walls:
         if old_region.colliderect(wall):
             wall.topleft += vec
+            spatial_grid_move(scene.wall_grid, wall, wall)
     for i, ent in enumerate(scene.entities):
         if old_region.colliderect(ent.get_hitbox()):
             _nudge_entity(scene, i, dx, dy)
+    hazard_map_build(scene.hazard_map, entity_hazards(scene.entities))
     for dec in scene.decor:
         if old_region.colliderect(decor_rect(dec)):
             dec.position += vec
+            spatial_grid_move(scene.decor_grid, dec, decor_rect(dec))
     old_region.topleft += vec
 
 
@@ -124,7 +156,27 @@ def _nudge_entity(scene: Scene, idx: int, dx: float, dy: float) -> Entity:
         js["pos"] = (js["pos"][0] + dx, js["pos"][1] + dy)
     if "path" in js:
         js["path"] = [(point[0] + dx, point[1] + dy) for point in js["path"]]
+    old = scene.entities[idx]
     scene.entities[idx] = entity_from_json(js)
+    spatial_grid_replace(
+        scene.entity_grid, old, scene.entities[idx], entity_grid_rect(scene.entities[idx])
+    )
+    return scene.entities[idx]
+
+
+# rebakes the hazard map if the entity is one, call after it's added, removed, moved or resized
+def _hazard_changed(scene: Scene, entity: Entity) -> None:
+    if entity.get_hazard() is not None:
+        hazard_map_build(scene.hazard_map, entity_hazards(scene.entities))
+
+
+# topmost entity under a point
+def _entity_at(scene: Scene, pos: pygame.Vector2) -> Entity | None:
+    candidates = spatial_grid_query(scene.entity_grid, pygame.Rect(pos.x, pos.y, 1, 1))
+    for entity in candidates[::-1]:
+        if entity.get_hitbox().collidepoint(pos):
+            return entity
+    return None
 
 
 class Editor:
@@ -191,13 +243,20 @@ class Editor:
                 print("ERROR: Failed to parse level data")
                 return
         self.scene.grid_collision = set([tuple(pos) for pos in data["grid_collision"]])
+        distance_field_build(self.scene.grid_distance, self.scene.grid_collision)
+        collision_mesh_build(self.scene.collision_mesh, self.scene.grid_collision)
         self.scene.grid_tiles = {
             (*map(int, k.split(",")),): [TileData(*tile) for tile in tiles]
             for k, tiles in data["grid_tiles"].items()
         }
         self.scene.walls = [pygame.Rect(wall) for wall in data["walls"]]
+        wall_grid_build(self.scene.wall_grid, self.scene.walls)
         self.scene.entities = [entity_from_json(entity) for entity in data["entities"]]
+        entity_grid_build(self.scene.entity_grid, self.scene.entities)
+        hazard_map_build(self.scene.hazard_map, entity_hazards(self.scene.entities))
         self.scene.decor = [decor_from_json(dec) for dec in data["decor"]]
+        decor_grid_build(self.scene.decor_grid, self.scene.decor)
+        terrain_cache_rebuild(self.scene.terrain_cache, self.scene.grid_tiles)
 
     def update_state(
         self, dt: float, action_buffer: t.InputBuffer, mouse_buffer: t.InputBuffer
@@ -288,6 +347,12 @@ class Editor:
                     self.scene.grid_collision.remove(id)
                 else:
                     self.scene.grid_collision.add(id)
+                distance_field_update(self.scene.grid_distance, self.scene.grid_collision, *id)
+                collision_mesh_update(self.scene.collision_mesh, self.scene.grid_collision, *id)
+                _collision_changed(
+                    self.scene,
+                    pygame.Rect(id[0] * c.TILE_SIZE, id[1] * c.TILE_SIZE, c.TILE_SIZE, c.TILE_SIZE),
+                )
             self.drag_tile = id
         else:
             self.drag_tile = None
@@ -295,12 +360,14 @@ class Editor:
         if t.is_pressed(self.mouse_buffer, t.MouseButton.LEFT) and self.a_held:
             self.drag_start = _camera_from_mouse(self.scene.camera)
             self.scene.walls.append(pygame.Rect(*self.drag_start, 1, 1))
+            spatial_grid_insert(self.scene.wall_grid, self.scene.walls[-1], self.scene.walls[-1])
 
         if t.is_pressed(self.mouse_buffer, t.MouseButton.RIGHT):
             pos = _camera_from_mouse(self.scene.camera)
             for i, wall in enumerate(self.scene.walls[::-1]):
                 if wall.collidepoint(pos):
                     self.scene.walls.pop(len(self.scene.walls) - 1 - i)
+                    spatial_grid_remove(self.scene.wall_grid, wall)
                     break
 
         if self.drag_start is not None:
@@ -308,16 +375,22 @@ class Editor:
             end = _camera_from_mouse(self.scene.camera)
             if self.a_held:
                 start, end = _floor_point(start), _ceil_point(end)
-            self.scene.walls[-1] = pygame.Rect(*start, end.x - start.x, end.y - start.y)
+            wall = pygame.Rect(*start, end.x - start.x, end.y - start.y)
+            spatial_grid_replace(self.scene.wall_grid, self.scene.walls[-1], wall, wall)
+            self.scene.walls[-1] = wall
             if t.is_released(self.mouse_buffer, t.MouseButton.LEFT):
                 if start.x > end.x or start.y > end.y:
-                    self.scene.walls.pop()
+                    spatial_grid_remove(self.scene.wall_grid, self.scene.walls.pop())
                 if start.x == end.x:
                     self.scene.walls[-1].width += 2
                     self.scene.walls[-1].x -= 1
                 if start.y == end.y:
                     self.scene.walls[-1].height += 2
                     self.scene.walls[-1].y -= 1
+                if len(self.scene.walls) > 0:
+                    spatial_grid_move(
+                        self.scene.wall_grid, self.scene.walls[-1], self.scene.walls[-1]
+                    )
                 self.drag_start = None
 
         if len(self.scene.walls) > 0 and self.a_held and g.show_hitboxes:
@@ -330,6 +403,7 @@ class Editor:
                 wall.y -= 1
             if t.is_pressed(self.action_buffer, t.Action.DOWN):
                 wall.y += 1
+            spatial_grid_move(self.scene.wall_grid, wall, wall)
 
     def tile_mode(self) -> None:
         if self.tile_group_index < 0:
@@ -371,6 +445,7 @@ class Editor:
                 # overwrite
                 else:
                     self.scene.grid_tiles[id] = [random.choice(new_tile_data)]
+                terrain_cache_invalidate(self.scene.terrain_cache, self.scene.grid_tiles, *id)
 
         if t.is_held(self.mouse_buffer, t.MouseButton.RIGHT):
             x, y = _floor_point(_camera_from_mouse(self.scene.camera), False)
@@ -382,6 +457,7 @@ class Editor:
                     self.scene.grid_tiles[id].pop()
                     if len(self.scene.grid_tiles[id]) == 0:
                         self.scene.grid_tiles.pop(id)
+                terrain_cache_invalidate(self.scene.terrain_cache, self.scene.grid_tiles, *id)
             self.drag_tile = id
         else:
             self.drag_tile = None
@@ -466,6 +542,8 @@ class Editor:
                     }
                 )
                 self.scene.entities.append(entity)
+                spatial_grid_insert(self.scene.entity_grid, entity, entity_grid_rect(entity))
+                _hazard_changed(self.scene, entity)
                 self.drag_start = pygame.Vector2(x, y)
                 self.entity_path.clear()
 
@@ -476,23 +554,22 @@ class Editor:
                     self.entity_path.pop()
             # delete entity
             else:
-                pos = _camera_from_mouse(self.scene.camera)
-                for i, entity in enumerate(self.scene.entities[::-1]):
-                    if entity.get_hitbox().collidepoint(pos):
-                        self.scene.entities.pop(len(self.scene.entities) - 1 - i)
-                        break
+                entity = _entity_at(self.scene, _camera_from_mouse(self.scene.camera))
+                if entity:
+                    self.scene.entities.remove(entity)
+                    spatial_grid_remove(self.scene.entity_grid, entity)
+                    _hazard_changed(self.scene, entity)
 
         if t.is_pressed(self.mouse_buffer, t.MouseButton.MIDDLE):
-            pos = _camera_from_mouse(self.scene.camera)
-            for i, entity in enumerate(self.scene.entities[::-1]):
-                if entity.get_hitbox().collidepoint(pos):
-                    self.entity_index = ENTITY_CLASSES.index(entity.__class__)
-                    self.entity_path = [point.copy() for point in entity.get_path() or []]
-                    # bring to front
-                    self.scene.entities.append(
-                        self.scene.entities.pop(len(self.scene.entities) - 1 - i)
-                    )
-                    break
+            entity = _entity_at(self.scene, _camera_from_mouse(self.scene.camera))
+            if entity:
+                self.entity_index = ENTITY_CLASSES.index(entity.__class__)
+                self.entity_path = [point.copy() for point in entity.get_path() or []]
+                # bring to front
+                self.scene.entities.remove(entity)
+                self.scene.entities.append(entity)
+                spatial_grid_remove(self.scene.entity_grid, entity)
+                spatial_grid_insert(self.scene.entity_grid, entity, entity_grid_rect(entity))
 
         ent = self.scene.entities[-1] if len(self.scene.entities) > 0 else None
 
@@ -504,38 +581,43 @@ class Editor:
                 ent.facing = (
                     round((end - self.drag_start).angle_to(pygame.Vector2(1, 0)) / 15.0) * 15
                 )
+            spatial_grid_move(self.scene.entity_grid, ent, entity_grid_rect(ent))
+            _hazard_changed(self.scene, ent)
             if t.is_released(self.mouse_buffer, t.MouseButton.LEFT):
                 self.drag_start = None
 
         if t.is_pressed(self.action_buffer, t.Action.LEFT):
             if self.a_held:
-                _nudge_entity(self.scene, -1, -c.HALF_TILE_SIZE, 0)
+                _hazard_changed(self.scene, _nudge_entity(self.scene, -1, -c.HALF_TILE_SIZE, 0))
             else:
                 self.entity_index = (self.entity_index - 1) % len(ENTITY_CLASSES)
         if t.is_pressed(self.action_buffer, t.Action.RIGHT):
             if self.a_held:
-                _nudge_entity(self.scene, -1, c.HALF_TILE_SIZE, 0)
+                _hazard_changed(self.scene, _nudge_entity(self.scene, -1, c.HALF_TILE_SIZE, 0))
             else:
                 self.entity_index = (self.entity_index + 1) % len(ENTITY_CLASSES)
         if t.is_pressed(self.action_buffer, t.Action.UP):
             if self.a_held:
-                _nudge_entity(self.scene, -1, 0, -c.HALF_TILE_SIZE)
+                _hazard_changed(self.scene, _nudge_entity(self.scene, -1, 0, -c.HALF_TILE_SIZE))
         if t.is_pressed(self.action_buffer, t.Action.DOWN):
             if self.a_held:
-                _nudge_entity(self.scene, -1, 0, c.HALF_TILE_SIZE)
+                _hazard_changed(self.scene, _nudge_entity(self.scene, -1, 0, c.HALF_TILE_SIZE))
 
     def decor_mode(self) -> None:
         self.debug_text = f"{self.decor_index}/{len(a.DECOR)-1}"
 
         if t.is_pressed(self.mouse_buffer, t.MouseButton.LEFT):
             pos = _floor_point(_camera_from_mouse(self.scene.camera))
-            self.scene.decor.append(Decor(pos, self.decor_index))
+            dec = Decor(pos, self.decor_index)
+            self.scene.decor.append(dec)
+            spatial_grid_insert(self.scene.decor_grid, dec, decor_rect(dec))
 
         if t.is_pressed(self.mouse_buffer, t.MouseButton.RIGHT):
             pos = _camera_from_mouse(self.scene.camera)
             for i, dec in enumerate(self.scene.decor[::-1]):
                 if decor_rect(dec).collidepoint(pos):
                     self.scene.decor.pop(len(self.scene.decor) - 1 - i)
+                    spatial_grid_remove(self.scene.decor_grid, dec)
                     break
 
         dec = None
@@ -557,6 +639,8 @@ class Editor:
         if t.is_pressed(self.action_buffer, t.Action.DOWN):
             if self.a_held and dec:
                 dec.position.y += c.HALF_TILE_SIZE
+        if self.a_held and dec:
+            spatial_grid_move(self.scene.decor_grid, dec, decor_rect(dec))
 
 
 def editor_update(
@@ -696,7 +780,8 @@ def editor_render(editor: Editor, surface: pygame.Surface):
                     1,
                 )
             else:
-                tile_render(surface, editor.scene.camera, x, y, new_tile_data)
+                tile_render(editor.scene.render_queue, editor.scene.camera, x, y, new_tile_data)
+                render_queue_flush(editor.scene.render_queue)
                 tile_render_hitbox(surface, editor.scene.camera, x, y, new_tile_data)
             surface.blit(
                 a.TERRAIN,
@@ -3,8 +3,10 @@ import pygame
 from components.audio import AudioChannel, play_sound
 import core.assets as a
 from components.camera import Camera, camera_to_screen_shake
+from components.distance import DistanceField
 from components.entities.entity import Entity
-from components.player import Player, player_rect
+from components.player import Player
+from components.render import RenderQueue, render_queue_blit
 from scenes.scene import RenderLayer
 
 
@@ -19,6 +21,12 @@ class ButtonEntity(Entity):
     def get_hitbox(self) -> pygame.Rect:
         return pygame.Rect(self.motion.position.x + 3, self.motion.position.y + 1, 10, 14)
 
+    def get_render_layers(self) -> tuple[RenderLayer, ...]:
+        return (RenderLayer.RAYS,)
+
+    def is_trigger(self) -> bool:
+        return True
+
     def to_json(self):
         return {"pos": (*self.motion.position,), "id": self.id, "color": self.color}
 
@@ -40,26 +48,26 @@ class ButtonEntity(Entity):
         player: Player,
         camera: Camera,
         grid_collision: set[tuple[int, int]],
+        grid_distance: DistanceField,
     ) -> None:
-        # collision
         self.activated = self.id in player.progression.activated_buttons
+
+    def trigger_stay(self, player: Player, camera: Camera) -> None:
         if player.z_position == 0:
-            prect = player_rect(player.motion)
-            prev_stepped = self.stepped_on
-            self.stepped_on = prect.colliderect(self.get_hitbox())
-            if (
-                self.stepped_on
-                and not prev_stepped
-                and self.id not in player.progression.activated_buttons
-            ):
+            if not self.stepped_on and self.id not in player.progression.activated_buttons:
                 player.progression.activated_buttons.add(self.id)
                 play_sound(AudioChannel.ENTITY, a.GATE_OPEN)
+            self.stepped_on = True
         else:
             self.stepped_on = False
 
-    def render(self, surface: pygame.Surface, camera: Camera, layer: RenderLayer) -> None:
+    def trigger_exit(self, player: Player, camera: Camera) -> None:
+        self.stepped_on = False
+
+    def render(self, queue: RenderQueue, camera: Camera, layer: RenderLayer) -> None:
         if layer == RenderLayer.RAYS:
-            surface.blit(
+            render_queue_blit(
+                queue,
                 a.BUTTON_FRAMES[self.color * 2 + (self.stepped_on or self.activated)],
                 camera_to_screen_shake(camera, *self.motion.position),
             )
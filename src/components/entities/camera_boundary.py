@@ -6,8 +6,10 @@ import core.globals as g
 from components.audio import AudioChannel, play_sound
 from components.motion import Direction
 from components.camera import Camera, camera_rect, camera_to_screen_shake
+from components.distance import DistanceField
 from components.entities.entity import Entity
-from components.player import Player, player_rect
+from components.player import Player
+from components.render import RenderQueue, render_queue_blit
 from scenes.scene import PLAYER_OR_FG, RenderLayer
 
 
@@ -28,6 +30,12 @@ class CameraBoundaryEntity(Entity):
             c.TILE_SIZE * self.h,
         )
 
+    def get_render_layers(self) -> tuple[RenderLayer, ...]:
+        return PLAYER_OR_FG if g.show_hitboxes else ()
+
+    def is_trigger(self) -> bool:
+        return self.trigger
+
     def to_json(self):
         return {
             "pos": (*self.motion.position,),
@@ -59,6 +67,7 @@ class CameraBoundaryEntity(Entity):
         player: Player,
         camera: Camera,
         grid_collision: set[tuple[int, int]],
+        grid_distance: DistanceField,
     ) -> None:
         crect = camera_rect(camera)
         hitbox = self.get_hitbox()
@@ -67,10 +76,8 @@ class CameraBoundaryEntity(Entity):
         if self.group:
             if self.group in player.progression.unlocked_camera_boundaries:
                 return
+        # triggers unlock their group in trigger_stay
         if self.trigger:
-            if player_rect(player.motion).colliderect(hitbox):
-                player.progression.unlocked_camera_boundaries.add(self.group)
-                play_sound(AudioChannel.ENTITY_ALT, a.BONUS_UNLOCK)
             return
 
         # because collision uses the actual camera position, the bounds will only 'unlock'
@@ -93,13 +100,20 @@ class CameraBoundaryEntity(Entity):
                     target = hitbox.left - crect.width // 2
                 camera.motion.position.x = target
 
-    def render(self, surface: pygame.Surface, camera: Camera, layer: RenderLayer) -> None:
+    def trigger_stay(self, player: Player, camera: Camera) -> None:
+        if self.group and self.group in player.progression.unlocked_camera_boundaries:
+            return
+        player.progression.unlocked_camera_boundaries.add(self.group)
+        play_sound(AudioChannel.ENTITY_ALT, a.BONUS_UNLOCK)
+
+    def render(self, queue: RenderQueue, camera: Camera, layer: RenderLayer) -> None:
         if layer in PLAYER_OR_FG and g.show_hitboxes:
             text = a.DEBUG_FONT.render(
                 ("T" if self.trigger else self.direction.name) + self.group, False, c.RED
             )
             hitbox = self.get_hitbox()
-            surface.blit(
+            render_queue_blit(
+                queue,
                 text,
                 camera_to_screen_shake(
                     camera,
@@ -4,14 +4,15 @@ import core.assets as a
 import core.constants as c
 import core.globals as g
 from components.camera import Camera, camera_to_screen_shake
+from components.distance import DistanceField
 from components.entities.entity import Entity
 from components.player import (
     MainStoryProgress,
     Player,
     PlayerInteraction,
-    player_rect,
     player_set_checkpoint,
 )
+from components.render import RenderQueue, render_queue_blit
 from scenes.scene import PLAYER_OR_FG, RenderLayer
 
 
@@ -31,6 +32,12 @@ class CheckpointEntity(Entity):
             c.TILE_SIZE * self.h,
         )
 
+    def get_render_layers(self) -> tuple[RenderLayer, ...]:
+        return PLAYER_OR_FG if g.show_hitboxes else ()
+
+    def is_trigger(self) -> bool:
+        return True
+
     def to_json(self):
         return {
             "pos": (*self.motion.position,),
@@ -60,18 +67,20 @@ class CheckpointEntity(Entity):
         player: Player,
         camera: Camera,
         grid_collision: set[tuple[int, int]],
+        grid_distance: DistanceField,
     ) -> None:
-        hitbox = self.get_hitbox()
-        if player_rect(player.motion).colliderect(hitbox):
-            pos = hitbox.center - pygame.Vector2(16, 32)
-            if player.progression.checkpoint != pos:
-                player_set_checkpoint(player, pos)
-                if self.story is not None and player.progression.main_story < self.story:
-                    player.progression.main_story = self.story
-                if self.scene_name is not None:
-                    player.interaction = PlayerInteraction(self.scene_name, False)
+        pass
+
+    def trigger_stay(self, player: Player, camera: Camera) -> None:
+        pos = self.get_hitbox().center - pygame.Vector2(16, 32)
+        if player.progression.checkpoint != pos:
+            player_set_checkpoint(player, pos)
+            if self.story is not None and player.progression.main_story < self.story:
+                player.progression.main_story = self.story
+            if self.scene_name is not None:
+                player.interaction = PlayerInteraction(self.scene_name, False)
 
-    def render(self, surface: pygame.Surface, camera: Camera, layer: RenderLayer) -> None:
+    def render(self, queue: RenderQueue, camera: Camera, layer: RenderLayer) -> None:
         if layer in PLAYER_OR_FG and g.show_hitboxes:
             content = ""
             if self.story is not None:
@@ -81,7 +90,8 @@ class CheckpointEntity(Entity):
             if content:
                 text = a.DEBUG_FONT.render(content, False, c.RED)
                 hitbox = self.get_hitbox()
-                surface.blit(
+                render_queue_blit(
+                    queue,
                     text,
                     camera_to_screen_shake(
                         camera,
@@ -1,13 +1,23 @@
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
 from typing import Any
 import pygame
 
 import core.constants as c
 import core.globals as g
 from components.entities.entity_util import render_path
-from components.player import Player
+from components.player import Player, player_rect
 from components.camera import Camera, camera_to_screen_shake_rect
+from components.distance import DistanceField
 from components.motion import Motion
+from components.render import RenderQueue, render_queue_surface
+from components.spatial import (
+    SpatialGrid,
+    spatial_grid_initialise,
+    spatial_grid_insert,
+    spatial_grid_move,
+    spatial_grid_query,
+)
 from scenes.scene import PLAYER_OR_FG, RenderLayer
 
 DIST_THRESHOLD = 300
@@ -37,6 +47,36 @@ class Entity(ABC):
     def get_path(self) -> list[pygame.Vector2]:
         return None
 
+    # layers that render draws anything in, the rest are never submitted
+    def get_render_layers(self) -> tuple[RenderLayer, ...]:
+        return tuple(RenderLayer)
+
+    # ground the player falls into if they're standing on it. hazards are baked into the
+    # scene's hazard map rather than checked in update
+    def get_hazard(self) -> pygame.Rect:
+        return None
+
+    # whether the player touching the hitbox is handled by the trigger methods below, which
+    # are called for every trigger the player touches wherever it is, rather than in update
+    def is_trigger(self) -> bool:
+        return False
+
+    # the player started touching the hitbox this frame, trigger_stay follows straight after
+    def trigger_enter(self, player: Player, camera: Camera) -> None:
+        pass
+
+    # the player is touching the hitbox this frame
+    def trigger_stay(self, player: Player, camera: Camera) -> None:
+        pass
+
+    # the player stopped touching the hitbox this frame
+    def trigger_exit(self, player: Player, camera: Camera) -> None:
+        pass
+
+    # the editor changed grid_collision somewhere in rect
+    def collision_changed(self, rect: pygame.Rect) -> None:
+        pass
+
     @abstractmethod
     def to_json(self) -> dict[str, Any]: ...
 
@@ -55,10 +95,11 @@ class Entity(ABC):
         player: Player,
         camera: Camera,
         grid_collision: set[tuple[int, int]],
+        grid_distance: DistanceField,
     ) -> None: ...
 
     @abstractmethod
-    def render(self, surface: pygame.Surface, camera: Camera, layer: RenderLayer) -> None: ...
+    def render(self, queue: RenderQueue, camera: Camera, layer: RenderLayer) -> None: ...
 
 
 def entity_follow(entity: Entity, dist: pygame.Vector2, speed: float):
@@ -66,10 +107,44 @@ def entity_follow(entity: Entity, dist: pygame.Vector2, speed: float):
         entity.motion.velocity = dist.normalize() * speed
 
 
+# area an entity can be found in. entities with a path are indexed by the whole path, with
+# some room around it for hitboxes that are offset from the entity's position
+def entity_grid_rect(entity: Entity) -> pygame.Rect:
+    path = entity.get_path()
+    if not path:
+        return entity.get_hitbox()
+    left, right = min(point.x for point in path), max(point.x for point in path)
+    top, bottom = min(point.y for point in path), max(point.y for point in path)
+    return pygame.Rect(left, top, right - left + 1, bottom - top + 1).inflate(
+        c.TILE_SIZE * 4, c.TILE_SIZE * 4
+    )
+
+
+def entity_grid_build(grid: SpatialGrid, entities: list[Entity]) -> None:
+    spatial_grid_initialise(grid)
+    for entity in entities:
+        spatial_grid_insert(grid, entity, entity_grid_rect(entity))
+
+
+# re-buckets an entity which may have moved off its path (or doesn't have one)
+def entity_grid_update(grid: SpatialGrid, entity: Entity) -> None:
+    if not entity.get_path():
+        spatial_grid_move(grid, entity, entity.get_hitbox())
+
+
+def entity_hazards(entities: list[Entity]) -> list[pygame.Rect]:
+    hazards = [entity.get_hazard() for entity in entities]
+    return [hazard for hazard in hazards if hazard is not None]
+
+
 def entity_reset(entity: Entity) -> None:
     entity.reset()
 
 
+def entity_collision_changed(entity: Entity, rect: pygame.Rect) -> None:
+    entity.collision_changed(rect)
+
+
 def entity_update(
     entity: Entity,
     dt: float,
@@ -77,24 +152,104 @@ def entity_update(
     player: Player,
     camera: Camera,
     grid_collision: set[tuple[int, int]],
+    grid_distance: DistanceField,
+) -> None:
+    entity.update(dt, time, player, camera, grid_collision, grid_distance)
+
+
+# the triggers the player was touching last frame. triggers are found through the entity grid,
+# which indexes them by their hitbox, so the ones the player isn't touching cost nothing
+@dataclass
+class EntityTriggers:
+    touching: list[Entity] = None
+
+
+def entity_triggers_initialise(triggers: EntityTriggers) -> None:
+    triggers.touching = []
+
+
+def entity_triggers_update(
+    triggers: EntityTriggers, grid: SpatialGrid, player: Player, camera: Camera
 ) -> None:
-    entity.update(dt, time, player, camera, grid_collision)
+    prect = player_rect(player.motion)
+    touching = [
+        entity
+        for entity in spatial_grid_query(grid, prect)
+        if entity.is_trigger() and prect.colliderect(entity.get_hitbox())
+    ]
+    for entity in triggers.touching:
+        if entity not in touching:
+            entity.trigger_exit(player, camera)
+    for entity in touching:
+        if entity not in triggers.touching:
+            entity.trigger_enter(player, camera)
+        entity.trigger_stay(player, camera)
+    triggers.touching = touching
 
 
 def entity_render(
     entity: Entity,
-    surface: pygame.Surface,
+    queue: RenderQueue,
     camera: Camera,
     layer: RenderLayer,
 ) -> None:
-    entity.render(surface, camera, layer)
+    entity.render(queue, camera, layer)
 
     if g.show_hitboxes:
         if layer == RenderLayer.RAYS:
             path = entity.get_path()
             if path is not None:
-                render_path(surface, camera, path)
+                render_path(render_queue_surface(queue), camera, path)
         if layer in PLAYER_OR_FG:
             hitbox = entity.get_hitbox()
             if hitbox:
+                surface = render_queue_surface(queue)
                 pygame.draw.rect(surface, c.RED, camera_to_screen_shake_rect(camera, *hitbox), 1)
+
+
+# one frame of entity draws, sorted by layer then by terrain cutoff so overlapping entities
+# are drawn back to front. it's drawn in order, a layer range at a time, around the rest of
+# the world
+@dataclass
+class EntityDisplayList:
+    items: list[tuple[RenderLayer, float, Entity]] = None
+    cursor: int = 0  # next item to draw
+
+
+def entity_display_list_initialise(display_list: EntityDisplayList) -> None:
+    display_list.items = []
+    display_list.cursor = 0
+
+
+# entity_cutoff is the player's, entities further back than it are behind the player
+def entity_display_list_build(
+    display_list: EntityDisplayList, entities: list[Entity], entity_cutoff: float
+) -> None:
+    display_list.items.clear()
+    display_list.cursor = 0
+    for entity in entities:
+        # hitbox overlays are drawn in the rays and foreground layers for every entity
+        layers = tuple(RenderLayer) if g.show_hitboxes else entity.get_render_layers()
+        if len(layers) == 0:
+            continue
+        cutoff = entity.get_terrain_cutoff()
+        if cutoff < entity_cutoff:
+            candidates = (RenderLayer.RAYS, RenderLayer.PLAYER_BG, RenderLayer.FOREGROUND)
+        else:
+            candidates = (RenderLayer.RAYS, RenderLayer.BACKGROUND, RenderLayer.PLAYER_FG)
+        for layer in candidates:
+            if layer in layers:
+                display_list.items.append((layer, cutoff, entity))
+    display_list.items.sort(key=lambda item: (item[0], item[1]))
+
+
+# draws everything up to and including last_layer that hasn't been drawn yet
+def entity_display_list_render(
+    display_list: EntityDisplayList, queue: RenderQueue, camera: Camera, last_layer: RenderLayer
+) -> None:
+    items = display_list.items
+    i = display_list.cursor
+    while i < len(items) and items[i][0] <= last_layer:
+        entity_render(items[i][2], queue, camera, items[i][0])
+        i += 1
+    display_list.cursor = i
@@ -4,32 +4,33 @@ import core.assets as a
 import core.constants as c
 from components.camera import Camera, camera_to_screen_shake
 from components.motion import Direction, Motion
+from components.render import RenderQueue, render_queue_blit
 
 
 def render_shadow(
-    surface: pygame.Surface,
+    queue: RenderQueue,
     camera: Camera,
     motion: Motion,
     direction: Direction,
     z_position: float = 0,
 ) -> None:
-    # use two vectors because we NEED to preserve decimal places
+    # use a vector because we NEED to preserve decimal places
     shadow_tl = pygame.Vector2(motion.position.x + 10, motion.position.y + 30)
-    shadow_wh = pygame.Vector2(12, 4)
+    shadow_w, shadow_h = 12, 4
     if motion.velocity.x != 0:
         if direction in (Direction.W, Direction.NW, Direction.SW):
-            shadow_wh.x += 2
+            shadow_w += 2
         elif direction in (Direction.E, Direction.NE, Direction.SE):
             shadow_tl.x -= 2
-            shadow_wh.x += 2
+            shadow_w += 2
     if z_position < -5:
-        shadow_wh.x -= 2
-        shadow_wh.y -= 2
+        shadow_w -= 2
+        shadow_h -= 2
         shadow_tl.x += 1
         shadow_tl.y += 1
-    shadow = pygame.Surface(shadow_wh, pygame.SRCALPHA)
-    pygame.draw.ellipse(shadow, (0, 0, 0, 50), pygame.Rect(0, 0, *shadow_wh))
-    surface.blit(shadow, camera_to_screen_shake(camera, *shadow_tl))
+    render_queue_blit(
+        queue, a.SHADOWS[(shadow_w, shadow_h)], camera_to_screen_shake(camera, *shadow_tl)
+    )
 
 
 def render_path(
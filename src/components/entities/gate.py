@@ -10,10 +10,12 @@ from components.animation import (
     animator_update,
 )
 from components.camera import Camera, camera_to_screen_shake
+from components.distance import DistanceField
 from components.player import Player, player_rect
 import core.assets as a
 import core.constants as c
 from components.entities.entity import Entity
+from components.render import RenderQueue, render_queue_blit
 from scenes.scene import PLAYER_LAYER, RenderLayer
 
 
@@ -41,6 +43,9 @@ class GateEntity(Entity):
     def get_terrain_cutoff(self) -> float:
         return self.motion.position.y + 32
 
+    def get_render_layers(self) -> tuple[RenderLayer, ...]:
+        return PLAYER_LAYER
+
     def to_json(self):
         return {"pos": (*self.motion.position,), "id": self.id, "color": self.color}
 
@@ -63,6 +68,7 @@ class GateEntity(Entity):
         player: Player,
         camera: Camera,
         grid_collision: set[tuple[int, int]],
+        grid_distance: DistanceField,
     ) -> None:
         # collision
         prev_activated = self.activated
@@ -85,9 +91,10 @@ class GateEntity(Entity):
             animator_reset(self.animator)
         animator_update(self.animator, dt)
 
-    def render(self, surface: pygame.Surface, camera: Camera, layer: RenderLayer) -> None:
+    def render(self, queue: RenderQueue, camera: Camera, layer: RenderLayer) -> None:
         if layer in PLAYER_LAYER:
-            surface.blit(
+            render_queue_blit(
+                queue,
                 animator_get_frame(self.animator),
                 camera_to_screen_shake(camera, *self.motion.position),
             )
@@ -2,8 +2,10 @@ import pygame
 
 import core.constants as c
 from components.camera import Camera
+from components.distance import DistanceField
 from components.entities.entity import Entity
-from components.player import Player, PlayerCaughtStyle, player_caught, player_rect
+from components.player import Player
+from components.render import RenderQueue
 from scenes.scene import RenderLayer
 
 
@@ -22,6 +24,12 @@ class LakeEnemy(Entity):
             c.TILE_SIZE * self.h - 6,
         )
 
+    def get_render_layers(self) -> tuple[RenderLayer, ...]:
+        return ()
+
+    def get_hazard(self) -> pygame.Rect:
+        return self.get_hitbox()
+
     def to_json(self):
         return {"pos": (*self.motion.position,), "w": self.w, "h": self.h}
 
@@ -42,10 +50,9 @@ class LakeEnemy(Entity):
         player: Player,
         camera: Camera,
         grid_collision: set[tuple[int, int]],
+        grid_distance: DistanceField,
     ) -> None:
-        prect = player_rect(player.motion)
-        if prect.colliderect(self.get_hitbox()) and player.z_position == 0:
-            player_caught(player, camera, PlayerCaughtStyle.HOLE)
+        pass
 
-    def render(self, surface: pygame.Surface, camera: Camera, layer: RenderLayer) -> None:
+    def render(self, queue: RenderQueue, camera: Camera, layer: RenderLayer) -> None:
         pass
@@ -13,10 +13,22 @@ from components.animation import (
     walking_animation_mapping,
 )
 from components.camera import Camera, camera_to_screen_shake
+from components.distance import DistanceField
 from components.entities.entity import DIST_THRESHOLD, TURN_THRESHOLD, Entity, entity_follow
 from components.motion import Direction, direction_from_angle, motion_update
 from components.player import Player, PlayerCaughtStyle, player_caught, player_rect
-from components.ray import SightData, sight_collides, sight_compile, sight_render
+from components.ray import (
+    SightData,
+    SightTable,
+    sight_collides,
+    sight_in_range,
+    sight_on_screen,
+    sight_render,
+    sight_table_clear,
+    sight_table_compile,
+    sight_table_initialise,
+)
+from components.render import RenderQueue, render_queue_blit
 from scenes.scene import PLAYER_LAYER, RenderLayer
 
 
@@ -29,6 +41,9 @@ class PatrolEnemy(Entity):
         self.facing = 0
         self.direction = Direction.N
         self.sight_data = SightData(c.TILE_SIZE * 5, 20, 0)
+        # the path never changes, so each spot and turn along it only needs raycasting once
+        self.sight_table = SightTable()
+        sight_table_initialise(self.sight_table)
         self.reset()
 
     def get_hitbox(self) -> pygame.Rect:
@@ -40,6 +55,18 @@ class PatrolEnemy(Entity):
     def get_path(self) -> list[pygame.Vector2]:
         return self.path
 
+    def get_render_layers(self) -> tuple[RenderLayer, ...]:
+        return (RenderLayer.RAYS, *PLAYER_LAYER)
+
+    def collision_changed(self, rect: pygame.Rect) -> None:
+        # anywhere the cone can reach from along the path
+        reach = self.sight_data.radius + abs(self.sight_data.z_offset)
+        xs = [point.x + 16 for point in self.path]
+        ys = [point.y + 16 for point in self.path]
+        area = pygame.Rect(min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys))
+        if rect.colliderect(area.inflate(reach * 2, reach * 2)):
+            sight_table_clear(self.sight_table)
+
     def to_json(self):
         if len(self.path) > 1:
             return {"path": path_to_json(self.path)}
@@ -68,6 +95,7 @@ class PatrolEnemy(Entity):
         player: Player,
         camera: Camera,
         grid_collision: set[tuple[int, int]],
+        grid_distance: DistanceField,
     ) -> None:
         if len(self.path) > 1:
             target = self.path[self.active_point]
@@ -100,8 +128,14 @@ class PatrolEnemy(Entity):
         else:
             self.sight_data.center = self.motion.position + pygame.Vector2(16, 16)
             self.sight_data.facing = self.facing
-            if len(self.path) > 1 or not self.sight_data.compiled:
-                sight_compile(self.sight_data, grid_collision)
+            # the cone is only needed when it could see the player or be seen
+            needed = sight_in_range(self.sight_data, prect.center) or sight_on_screen(
+                self.sight_data, camera
+            )
+            if needed:
+                sight_table_compile(
+                    self.sight_table, self.sight_data, grid_collision, grid_distance
+                )
             if sight_collides(self.sight_data, prect.center):
                 player_caught(player, camera, PlayerCaughtStyle.SIGHT)
         motion_update(self.motion, dt)
@@ -122,14 +156,15 @@ class PatrolEnemy(Entity):
                     a.FOOTSTEPS[2 if self.animator.frame_index == step_frames[0] else 3],
                 )
 
-    def render(self, surface: pygame.Surface, camera: Camera, layer: RenderLayer) -> None:
+    def render(self, queue: RenderQueue, camera: Camera, layer: RenderLayer) -> None:
         frame = animator_get_frame(self.animator)
         if layer == RenderLayer.RAYS:
-            sight_render(surface, camera, self.sight_data)
+            sight_render(queue, camera, self.sight_data)
         if layer in PLAYER_LAYER:
             # i present to you, illogical changes, because it looks better.
-            # render_shadow(surface, camera, self.motion, self.direction)
-            surface.blit(
+            # render_shadow(queue, camera, self.motion, self.direction)
+            render_queue_blit(
+                queue,
                 frame,
                 camera_to_screen_shake(camera, self.motion.position.x, self.motion.position.y - 1),
             )
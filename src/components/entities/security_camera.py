@@ -14,6 +14,7 @@ from components.animation import (
     directional_animation_mapping,
 )
 from components.camera import Camera, camera_to_screen_shake
+from components.distance import DistanceField
 from components.entities.entity import Entity
 from components.motion import direction_from_angle
 from components.player import (
@@ -23,7 +24,19 @@ from components.player import (
     player_caught,
     player_rect,
 )
-from components.ray import SightData, sight_collides, sight_compile, sight_render
+from components.ray import (
+    SightData,
+    SightTable,
+    sight_collides,
+    sight_in_range,
+    sight_on_screen,
+    sight_rect,
+    sight_render,
+    sight_table_clear,
+    sight_table_compile,
+    sight_table_initialise,
+)
+from components.render import RenderQueue, render_queue_blit
 from scenes.scene import PLAYER_LAYER, RenderLayer
 
 
@@ -49,6 +62,9 @@ class SecurityCameraEnemy(Entity):
         self.facing = 0
         self.inverse_direction = False
         self.sight_data = SightData(c.TILE_SIZE * 5.5, 45, -16)
+        # the camera never moves, so each facing of the swivel only needs raycasting once
+        self.sight_table = SightTable()
+        sight_table_initialise(self.sight_table)
         self.swivel = 0
         self.swivel_angle = 60
         self.should_raycast = False
@@ -56,6 +72,13 @@ class SecurityCameraEnemy(Entity):
     def get_hitbox(self) -> pygame.Rect:
         return pygame.Rect(*self.motion.position, 16, 16)
 
+    def get_render_layers(self) -> tuple[RenderLayer, ...]:
+        return (RenderLayer.RAYS, *PLAYER_LAYER)
+
+    def collision_changed(self, rect: pygame.Rect) -> None:
+        if self.sight_data.center is not None and rect.colliderect(sight_rect(self.sight_data)):
+            sight_table_clear(self.sight_table)
+
     def to_json(self):
         js = {
             "pos": (*self.motion.position,),
@@ -86,6 +109,7 @@ class SecurityCameraEnemy(Entity):
         player: Player,
         camera: Camera,
         grid_collision: set[tuple[int, int]],
+        grid_distance: DistanceField,
     ) -> None:
         # don't swivel before the player has gotten comms (prevent progression)
         # don't swivel during the finale (prevent going back)
@@ -100,20 +124,31 @@ class SecurityCameraEnemy(Entity):
         prect = player_rect(player.motion)
         self.sight_data.center = self.motion.position + pygame.Vector2(8, 8)
         self.sight_data.facing = self.facing + self.swivel
-        sight_compile(self.sight_data, grid_collision if self.should_raycast else None)
-        if sight_collides(self.sight_data, prect.center):
-            player_caught(player, camera, PlayerCaughtStyle.SIGHT)
+        # the cone is only needed when it could see the player or be seen
+        needed = sight_in_range(self.sight_data, prect.center) or sight_on_screen(
+            self.sight_data, camera
+        )
+        if needed:
+            if self.should_raycast:
+                sight_table_compile(
+                    self.sight_table, self.sight_data, grid_collision, grid_distance
+                )
+            else:
+                sight_table_compile(self.sight_table, self.sight_data)
+            if sight_collides(self.sight_data, prect.center):
+                player_caught(player, camera, PlayerCaughtStyle.SIGHT)
 
         # animation
         direction = direction_from_angle(self.facing + self.swivel)
         animator_switch_animation(self.animator, f"swivel_{direction}")
         animator_update(self.animator, dt)
 
-    def render(self, surface: pygame.Surface, camera: Camera, layer: RenderLayer) -> None:
+    def render(self, queue: RenderQueue, camera: Camera, layer: RenderLayer) -> None:
         if layer == RenderLayer.RAYS:
-            sight_render(surface, camera, self.sight_data)
+            sight_render(queue, camera, self.sight_data)
         if layer in PLAYER_LAYER:
-            surface.blit(
+            render_queue_blit(
+                queue,
                 animator_get_frame(self.animator),
                 camera_to_screen_shake(
                     camera,
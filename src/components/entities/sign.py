@@ -4,8 +4,10 @@ from components.motion import Direction
 import core.assets as a
 import core.constants as c
 from components.camera import Camera, camera_to_screen_shake
+from components.distance import DistanceField
 from components.entities.entity import Entity
-from components.player import Player, PlayerInteraction, player_rect
+from components.player import Player, PlayerInteraction
+from components.render import RenderQueue, render_queue_blit, render_queue_surface
 from scenes.scene import PLAYER_LAYER, PLAYER_OR_BG, PLAYER_OR_FG, RenderLayer
 
 
@@ -23,6 +25,13 @@ class SignEntity(Entity):
         else:
             return pygame.Rect(self.motion.position.x - 2, self.motion.position.y + 16, 20, 20)
 
+    def get_render_layers(self) -> tuple[RenderLayer, ...]:
+        layers = PLAYER_OR_BG if self.floor else PLAYER_LAYER
+        return layers + PLAYER_OR_FG if self.show_arrow else layers
+
+    def is_trigger(self) -> bool:
+        return True
+
     def to_json(self):
         return {
             "pos": (*self.motion.position,),
@@ -50,20 +59,29 @@ class SignEntity(Entity):
         player: Player,
         camera: Camera,
         grid_collision: set[tuple[int, int]],
+        grid_distance: DistanceField,
     ) -> None:
-        if player.z_position == 0 and player_rect(player.motion).colliderect(self.get_hitbox()):
+        pass
+
+    def trigger_stay(self, player: Player, camera: Camera) -> None:
+        if player.z_position == 0:
             self.show_arrow = True
             player.interaction = PlayerInteraction(
                 self.scene_name, True, None if self.floor else Direction.N
             )
-        elif self.show_arrow:
+        else:
+            self.trigger_exit(player, camera)
+
+    def trigger_exit(self, player: Player, camera: Camera) -> None:
+        if self.show_arrow:
             self.show_arrow = False
             if player.interaction.scene_name == self.scene_name:
                 player.interaction.scene_name = None
 
-    def render(self, surface: pygame.Surface, camera: Camera, layer: RenderLayer) -> None:
+    def render(self, queue: RenderQueue, camera: Camera, layer: RenderLayer) -> None:
         if (not self.floor and layer in PLAYER_LAYER) or (self.floor and layer in PLAYER_OR_BG):
-            surface.blit(
+            render_queue_blit(
+                queue,
                 a.TERRAIN,
                 camera_to_screen_shake(camera, *self.motion.position),
                 (self.color * c.TILE_SIZE, 6 * c.TILE_SIZE, c.TILE_SIZE, c.TILE_SIZE),
@@ -81,6 +99,7 @@ class SignEntity(Entity):
                 (x - 6, y - 4),
                 (x - 18, y - 4),
             ]
+            surface = render_queue_surface(queue)
             pygame.draw.polygon(
                 surface, c.BLACK, [camera_to_screen_shake(camera, *point) for point in points]
             )
@@ -89,7 +108,8 @@ class SignEntity(Entity):
                 surface, c.WHITE, [camera_to_screen_shake(camera, *point) for point in points]
             )
             text = a.DEBUG_FONT.render("JUMP", False, c.WHITE)
-            surface.blit(
+            render_queue_blit(
+                queue,
                 text,
                 camera_to_screen_shake(
                     camera, x - text.get_width() // 2, y - text.get_height() - 3
@@ -11,8 +11,10 @@ from components.animation import (
     animator_update,
 )
 from components.camera import Camera, camera_to_screen_shake
+from components.distance import DistanceField
 from components.entities.entity import Entity
-from components.player import Player, PlayerCaughtStyle, player_caught, player_rect
+from components.player import Player, PlayerCaughtStyle, player_caught
+from components.render import RenderQueue, render_queue_blit
 from scenes.scene import RenderLayer
 
 
@@ -33,6 +35,12 @@ class SpikeTrapEnemy(Entity):
     def get_hitbox(self) -> pygame.Rect:
         return pygame.Rect(self.motion.position.x + 4, self.motion.position.y + 1, 8, 14)
 
+    def get_render_layers(self) -> tuple[RenderLayer, ...]:
+        return (RenderLayer.RAYS,)
+
+    def is_trigger(self) -> bool:
+        return True
+
     def to_json(self):
         return {"pos": (*self.motion.position,), "activated": self.initial_activated}
 
@@ -58,24 +66,32 @@ class SpikeTrapEnemy(Entity):
         player: Player,
         camera: Camera,
         grid_collision: set[tuple[int, int]],
+        grid_distance: DistanceField,
     ) -> None:
-        prect = player_rect(player.motion)
-        prev_stepped = self.stepped_on
-        self.stepped_on = prect.colliderect(self.get_hitbox()) and player.z_position == 0
-        if self.stepped_on and not prev_stepped:
+        animator_update(self.animator, dt)
+
+    def trigger_stay(self, player: Player, camera: Camera) -> None:
+        if player.z_position != 0:
+            self.trigger_exit(player, camera)
+        elif not self.stepped_on:
+            self.stepped_on = True
             if not self.activated:
                 animator_switch_animation(self.animator, "stepped_on")
             else:
                 player_caught(player, camera, PlayerCaughtStyle.HOLE)
-        elif not self.stepped_on and prev_stepped:
+
+    def trigger_exit(self, player: Player, camera: Camera) -> None:
+        # springs once the player steps off
+        if self.stepped_on:
+            self.stepped_on = False
             self.activated = True
             animator_switch_animation(self.animator, "activated")
             animator_reset(self.animator)
-        animator_update(self.animator, dt)
 
-    def render(self, surface: pygame.Surface, camera: Camera, layer: RenderLayer) -> None:
+    def render(self, queue: RenderQueue, camera: Camera, layer: RenderLayer) -> None:
         if layer == RenderLayer.RAYS:
-            surface.blit(
+            render_queue_blit(
+                queue,
                 animator_get_frame(self.animator),
                 camera_to_screen_shake(camera, *self.motion.position),
             )
@@ -1,11 +1,14 @@
 import pygame
 
+import core.assets as a
 import core.constants as c
 from components.camera import Camera, camera_to_screen_shake
+from components.distance import DistanceField
 from components.entities.entity import DIST_THRESHOLD, Entity, entity_follow
 from components.entities.entity_util import path_from_json, path_to_json
 from components.motion import motion_update
 from components.player import Player, PlayerCaughtStyle, player_caught, player_rect
+from components.render import RenderQueue, render_queue_blit
 from scenes.scene import PLAYER_OR_FG, RenderLayer
 from utilities.math import point_in_ellipse
 
@@ -15,13 +18,17 @@ class SpotlightEnemy(Entity):
         super().__init__()
         self.path: list[pygame.Vector2] = path
         self.active_point = 0
-        self.light_radius = c.TILE_SIZE * 3
-        self.my_special_perspective_scale = 0.66
+        # the light's sprite is drawn once at this size in assets
+        self.light_radius = c.SPOTLIGHT_RADIUS
+        self.my_special_perspective_scale = c.SPOTLIGHT_PERSPECTIVE_SCALE
         self.reset()
 
     def get_path(self) -> list[pygame.Vector2]:
         return self.path
 
+    def get_render_layers(self) -> tuple[RenderLayer, ...]:
+        return PLAYER_OR_FG
+
     def to_json(self):
         return {"path": path_to_json(self.path)}
 
@@ -40,6 +47,7 @@ class SpotlightEnemy(Entity):
         player: Player,
         camera: Camera,
         grid_collision: set[tuple[int, int]],
+        grid_distance: DistanceField,
     ) -> None:
         if len(self.path) > 0:
             target = self.path[self.active_point]
@@ -65,14 +73,13 @@ class SpotlightEnemy(Entity):
 
         motion_update(self.motion, dt)
 
-    def render(self, surface: pygame.Surface, camera: Camera, layer: RenderLayer) -> None:
+    def render(self, queue: RenderQueue, camera: Camera, layer: RenderLayer) -> None:
         if layer in PLAYER_OR_FG:
             rx, ry = self.light_radius, self.light_radius * self.my_special_perspective_scale
             render_position = (self.motion.position.x - rx, self.motion.position.y - ry)
-            sprite = pygame.Surface((rx * 2, ry * 2), pygame.SRCALPHA)
-            pygame.draw.ellipse(sprite, (64, 64, 64), sprite.get_rect())
-            surface.blit(
-                sprite,
+            render_queue_blit(
+                queue,
+                a.SPOTLIGHT,
                 camera_to_screen_shake(camera, *render_position),
                 special_flags=pygame.BLEND_RGB_ADD,
             )
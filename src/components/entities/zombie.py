@@ -15,9 +15,11 @@ from components.animation import (
     walking_animation_mapping,
 )
 from components.camera import Camera, camera_to_screen_shake
+from components.distance import DistanceField
 from components.entities.entity import DIST_THRESHOLD, Entity, entity_follow
 from components.motion import Direction, direction_from_delta, motion_update
 from components.player import Player, PlayerCaughtStyle, player_caught, player_rect
+from components.render import RenderQueue, render_queue_blit
 from scenes.scene import PLAYER_LAYER, PLAYER_OR_FG, RenderLayer
 
 
@@ -45,6 +47,9 @@ class ZombieEnemy(Entity):
     def get_terrain_cutoff(self) -> float:
         return self.motion.position.y + 32
 
+    def get_render_layers(self) -> tuple[RenderLayer, ...]:
+        return (RenderLayer.RAYS, *PLAYER_LAYER)
+
     def to_json(self):
         return {"pos": (*self.movement_center,)}
 
@@ -69,6 +74,7 @@ class ZombieEnemy(Entity):
         player: Player,
         camera: Camera,
         grid_collision: set[tuple[int, int]],
+        grid_distance: DistanceField,
     ) -> None:
         self.motion.velocity = pygame.Vector2()
         prect = player_rect(player.motion)
@@ -107,15 +113,16 @@ class ZombieEnemy(Entity):
 
         motion_update(self.motion, dt)
 
-    def render(self, surface: pygame.Surface, camera: Camera, layer: RenderLayer) -> None:
+    def render(self, queue: RenderQueue, camera: Camera, layer: RenderLayer) -> None:
         if layer == RenderLayer.RAYS:
             screen_pos = camera_to_screen_shake(camera, *self.movement_center)
             screen_pos = (screen_pos[0] - RADIUS + 16, screen_pos[1] - RADIUS + 30)
-            surface.blit(RANGE_CIRCLE, screen_pos)
+            render_queue_blit(queue, RANGE_CIRCLE, screen_pos)
 
         if layer in PLAYER_LAYER:
-            render_shadow(surface, camera, self.motion, self.direction)
-            surface.blit(
+            render_shadow(queue, camera, self.motion, self.direction)
+            render_queue_blit(
+                queue,
                 animator_get_frame(self.animator),
                 camera_to_screen_shake(camera, *self.motion.position),
             )
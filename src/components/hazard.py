@@ -0,0 +1,61 @@
+from dataclasses import dataclass
+import pygame
+
+import core.constants as c
+
+# one full row of a cell's mask, dividing n full rows by this leaves a 1 at the start of each
+_ROW_MASK = (1 << c.TILE_SIZE) - 1
+
+
+# ground hazards (lakes) baked into a bitmask per cell, one bit per pixel, so whether something
+# is standing in one is a lookup or two however many there are
+@dataclass
+class HazardMap:
+    masks: dict[tuple[int, int], int] = None  # cell -> pixels inside a hazard, bit y * size + x
+
+
+# the pixels rect covers in the cell
+def _cell_mask(rect: pygame.Rect, cell_x: int, cell_y: int) -> int:
+    size = c.TILE_SIZE
+    x0 = max(rect.left - cell_x * size, 0)
+    x1 = min(rect.right - cell_x * size, size)
+    y0 = max(rect.top - cell_y * size, 0)
+    y1 = min(rect.bottom - cell_y * size, size)
+    rows = ((1 << size * (y1 - y0)) - 1) // _ROW_MASK << size * y0
+    return ((1 << x1 - x0) - 1 << x0) * rows
+
+
+def _rect_cells(rect: pygame.Rect) -> list[tuple[int, int]]:
+    size = c.TILE_SIZE
+    return [
+        (x, y)
+        for y in range(rect.top // size, (rect.bottom - 1) // size + 1)
+        for x in range(rect.left // size, (rect.right - 1) // size + 1)
+    ]
+
+
+def hazard_map_initialise(hazards: HazardMap) -> None:
+    hazards.masks = {}
+
+
+# call whenever a hazard is added, removed, moved or resized
+def hazard_map_build(hazards: HazardMap, rects: list[pygame.Rect]) -> None:
+    hazards.masks = {}
+    for rect in rects:
+        # empty rects never collide
+        if rect.w <= 0 or rect.h <= 0:
+            continue
+        for cell in _rect_cells(rect):
+            hazards.masks[cell] = hazards.masks.get(cell, 0) | _cell_mask(rect, *cell)
+
+
+# whether rect overlaps any hazard, the same as colliderect against each of them
+def hazard_map_collides(hazards: HazardMap, rect: pygame.Rect) -> bool:
+    if rect.w <= 0 or rect.h <= 0:
+        return False
+    for cell in _rect_cells(rect):
+        # most cells have nothing in them, so only work out the mask when one does
+        mask = hazards.masks.get(cell)
+        if mask is not None and mask & _cell_mask(rect, *cell):
+            return True
+    return False
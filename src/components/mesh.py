@@ -0,0 +1,81 @@
+from dataclasses import dataclass
+import pygame
+
+import core.constants as c
+
+
+# grid_collision merged into as few rectangles as possible (greedy meshing), each solid cell
+# maps to the rect covering it. cells in the same rect share the one Rect object
+@dataclass
+class CollisionMesh:
+    rects: dict[tuple[int, int], pygame.Rect] = None  # solid cell -> merged rect, in pixels
+
+
+# merges cells (all solid and not in the mesh) row by row: runs as wide as they go, then as
+# many rows down as the whole run continues
+def _mesh_cells(mesh: CollisionMesh, cells: set[tuple[int, int]]) -> None:
+    for x, y in sorted(cells, key=lambda cell: (cell[1], cell[0])):
+        if (x, y) in mesh.rects:
+            continue
+        w = 1
+        while (x + w, y) in cells and (x + w, y) not in mesh.rects:
+            w += 1
+        h = 1
+        while all((i, y + h) in cells and (i, y + h) not in mesh.rects for i in range(x, x + w)):
+            h += 1
+        rect = pygame.Rect(x * c.TILE_SIZE, y * c.TILE_SIZE, w * c.TILE_SIZE, h * c.TILE_SIZE)
+        for j in range(y, y + h):
+            for i in range(x, x + w):
+                mesh.rects[(i, j)] = rect
+
+
+def collision_mesh_initialise(mesh: CollisionMesh) -> None:
+    mesh.rects = {}
+
+
+# call whenever grid_collision is replaced or changed in bulk
+def collision_mesh_build(mesh: CollisionMesh, grid_collision: set[tuple[int, int]]) -> None:
+    mesh.rects = {}
+    _mesh_cells(mesh, grid_collision)
+
+
+# call after the cell at (grid_x, grid_y) is added to or removed from grid_collision
+def collision_mesh_update(
+    mesh: CollisionMesh, grid_collision: set[tuple[int, int]], grid_x: int, grid_y: int
+) -> None:
+    # take apart the rect the cell was in and the ones it could join, then mesh them again
+    neighbours = (
+        (grid_x, grid_y),
+        (grid_x - 1, grid_y),
+        (grid_x + 1, grid_y),
+        (grid_x, grid_y - 1),
+        (grid_x, grid_y + 1),
+    )
+    freed = set()
+    for cell in neighbours:
+        rect = mesh.rects.get(cell)
+        if rect is None:
+            continue
+        left, top = rect.x // c.TILE_SIZE, rect.y // c.TILE_SIZE
+        for y in range(top, top + rect.h // c.TILE_SIZE):
+            for x in range(left, left + rect.w // c.TILE_SIZE):
+                mesh.rects.pop((x, y), None)
+                freed.add((x, y))
+    freed.add((grid_x, grid_y))
+    _mesh_cells(mesh, {cell for cell in freed if cell in grid_collision})
+
+
+# merged rect covering the cell, or None if it isn't solid
+def collision_mesh_rect(mesh: CollisionMesh, x: int, y: int) -> pygame.Rect | None:
+    return mesh.rects.get((x, y))
+
+
+# every merged rect overlapping tile_bounds (in grid coordinates, inclusive), once each
+def collision_mesh_query(mesh: CollisionMesh, tile_bounds: pygame.Rect) -> list[pygame.Rect]:
+    found = {}
+    for y in range(tile_bounds.top, tile_bounds.bottom + 1):
+        for x in range(tile_bounds.left, tile_bounds.right + 1):
+            rect = mesh.rects.get((x, y))
+            if rect is not None:
+                found[id(rect)] = rect
+    return list(found.values())
@@ -46,3 +46,37 @@ def motion_update(motion: Motion, dt: float) -> None:
     motion.velocity.y += motion.acceleration.y * dt
     motion.position.x += motion.velocity.x * dt
     motion.position.y += motion.velocity.y * dt
+
+
+# where motions were before the last fixed step, so they can be drawn part of the way from
+# there to where they are now
+@dataclass
+class MotionInterpolation:
+    previous: list[tuple[Motion, pygame.Vector2]] = None  # motion -> position before the step
+    current: list[tuple[Motion, pygame.Vector2]] = None  # motion -> position to put back
+
+
+def motion_interpolation_initialise(interpolation: MotionInterpolation) -> None:
+    interpolation.previous = []
+    interpolation.current = []
+
+
+# call before each step (or after a teleport, so it isn't drawn sliding there)
+def motion_interpolation_snapshot(
+    interpolation: MotionInterpolation, motions: list[Motion]
+) -> None:
+    interpolation.previous = [(motion, motion.position.copy()) for motion in motions]
+
+
+# moves every motion alpha of the way from its position before the step, until restored
+def motion_interpolation_apply(interpolation: MotionInterpolation, alpha: float) -> None:
+    interpolation.current = []
+    for motion, previous in interpolation.previous:
+        interpolation.current.append((motion, motion.position))
+        motion.position = previous.lerp(motion.position, alpha)
+
+
+def motion_interpolation_restore(interpolation: MotionInterpolation) -> None:
+    for motion, position in interpolation.current:
+        motion.position = position
+    interpolation.current = []
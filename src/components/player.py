@@ -13,7 +13,8 @@ from components.dialogue import (
     dialogue_has_executed_scene,
 )
 from components.entities.entity_util import render_shadow
-from components.tile import grid_collision_rect
+from components.mesh import CollisionMesh, collision_mesh_query
+from components.spatial import SpatialGrid, spatial_grid_query
 from components.timer import Timer, timer_reset, timer_update
 from components.motion import (
     Direction,
@@ -28,6 +29,7 @@ from components.camera import (
     camera_to_screen_shake,
     camera_to_screen_shake_rect,
 )
+from components.render import RenderQueue, render_queue_blit
 from components.animation import (
     Animator,
     Animation,
@@ -147,53 +149,113 @@ def _player_movement(player: Player, dt: float, action_buffer: t.InputBuffer) ->
         player.motion.velocity *= 0.707  # trig shortcut, normalizing the vector
 
 
+def _player_collide_x(player: Player, m: Motion, prect: pygame.Rect, wall: pygame.Rect) -> None:
+    if m.velocity.x > 0:
+        player.motion.position.x = wall.left - prect.w - 11
+    else:
+        player.motion.position.x = wall.right - 11
+    player.motion.velocity.x = 0
+
+
+def _player_collide_y(player: Player, m: Motion, prect: pygame.Rect, wall: pygame.Rect) -> None:
+    if m.velocity.y > 0:
+        player.motion.position.y = wall.top - 32
+    else:
+        player.motion.position.y = wall.bottom - 32 + prect.h
+    player.motion.velocity.y = 0
+
+
+# walls and merged grid rects overlapping the space prect sweeps through on its way to moved
+def _player_swept_walls(
+    prect: pygame.Rect,
+    moved: pygame.Rect,
+    collision_mesh: CollisionMesh,
+    wall_grid: SpatialGrid,
+) -> list[pygame.Rect]:
+    swept = prect.union(moved)
+    left, top = swept.left // c.TILE_SIZE, swept.top // c.TILE_SIZE
+    tile_bounds = pygame.Rect(
+        left,
+        top,
+        (swept.right - 1) // c.TILE_SIZE - left,
+        (swept.bottom - 1) // c.TILE_SIZE - top,
+    )
+    walls = spatial_grid_query(wall_grid, swept)
+    for wall in collision_mesh_query(collision_mesh, tile_bounds):
+        if swept.colliderect(wall):
+            walls.append(wall)
+    return walls
+
+
+# moves the player out of any wall it's already in, by the shortest way out. the sweep only
+# looks at walls ahead of the player, a merged rect's far edge can be many tiles away
+def _player_push_out(player: Player, collision_mesh: CollisionMesh, wall_grid: SpatialGrid) -> None:
+    prect = player_rect(player.motion)
+    for wall in _player_swept_walls(prect, prect, collision_mesh, wall_grid):
+        if not prect.colliderect(wall):
+            continue
+        left, right = prect.right - wall.left, wall.right - prect.left
+        up, down = prect.bottom - wall.top, wall.bottom - prect.top
+        push = min(left, right, up, down)
+        if push == left:
+            player.motion.position.x = wall.left - prect.w - 11
+        elif push == right:
+            player.motion.position.x = wall.right - 11
+        elif push == up:
+            player.motion.position.y = wall.top - 32
+        else:
+            player.motion.position.y = wall.bottom - 32 + prect.h
+        prect = player_rect(player.motion)
+
+
 def _player_collision(
-    player: Player, dt: float, grid_collision: set[tuple[int, int]], walls: list[pygame.Rect]
+    player: Player, dt: float, collision_mesh: CollisionMesh, wall_grid: SpatialGrid
 ) -> None:
     # I'VE PLAYED THESE GAMES BEFOREEEE
+    # each axis is swept on its own, stopping at the first wall met (the earliest time of
+    # impact) and leaving the other axis free to slide along it. sweeping rather than checking
+    # where the player ends up means no speed or dt can carry it through a thin wall. walls it's
+    # already in are pushed out of first, so only the walls ahead of it are swept
+    _player_push_out(player, collision_mesh, wall_grid)
+
     # horizontal collision
     if player.motion.velocity.x != 0:
         m = player.motion.copy()
         m.velocity.y = 0
         motion_update(m, dt)
-        prect = player_rect(m)
-        top, bottom = prect.top // c.TILE_SIZE, prect.bottom // c.TILE_SIZE
-        left, right = prect.left // c.TILE_SIZE, prect.right // c.TILE_SIZE
-        walls_with_grid = walls + [
-            grid_collision_rect(grid_collision, right, top),
-            grid_collision_rect(grid_collision, right, bottom),
-            grid_collision_rect(grid_collision, left, top),
-            grid_collision_rect(grid_collision, left, bottom),
-        ]
-        for wall in walls_with_grid:
-            if wall is not None and prect.colliderect(wall):
-                if m.velocity.x > 0:
-                    player.motion.position.x = wall.left - prect.w - 11
-                else:
-                    player.motion.position.x = wall.right - 11
-                player.motion.velocity.x = 0
+        prect, moved = player_rect(player.motion), player_rect(m)
+        hit = None
+        for wall in _player_swept_walls(prect, moved, collision_mesh, wall_grid):
+            if m.velocity.x > 0:
+                ahead = wall.left >= prect.right
+                nearer = hit is None or wall.left < hit.left
+            else:
+                ahead = wall.right <= prect.left
+                nearer = hit is None or wall.right > hit.right
+            if ahead and nearer:
+                hit = wall
+        if hit is not None:
+            _player_collide_x(player, m, moved, hit)
 
     # vertical collision
     if player.motion.velocity.y != 0:
+        # from where the horizontal move left the player, so it can't cut across a corner
         m = player.motion.copy()
-        m.velocity.x = 0
         motion_update(m, dt)
-        prect = player_rect(m)
-        top, bottom = prect.top // c.TILE_SIZE, prect.bottom // c.TILE_SIZE
-        left, right = prect.left // c.TILE_SIZE, prect.right // c.TILE_SIZE
-        walls_with_grid = walls + [
-            grid_collision_rect(grid_collision, right, top),
-            grid_collision_rect(grid_collision, left, top),
-            grid_collision_rect(grid_collision, right, bottom),
-            grid_collision_rect(grid_collision, left, bottom),
-        ]
-        for wall in walls_with_grid:
-            if wall is not None and prect.colliderect(wall):
-                if m.velocity.y > 0:
-                    player.motion.position.y = wall.top - 32
-                else:
-                    player.motion.position.y = wall.bottom - 32 + prect.h
-                player.motion.velocity.y = 0
+        prect, moved = player_rect(player.motion), player_rect(m)
+        prect.x = moved.x
+        hit = None
+        for wall in _player_swept_walls(prect, moved, collision_mesh, wall_grid):
+            if m.velocity.y > 0:
+                ahead = wall.top >= prect.bottom
+                nearer = hit is None or wall.top < hit.top
+            else:
+                ahead = wall.bottom <= prect.top
+                nearer = hit is None or wall.bottom > hit.bottom
+            if ahead and nearer:
+                hit = wall
+        if hit is not None:
+            _player_collide_y(player, m, moved, hit)
 
 
 def player_update(
@@ -201,8 +263,8 @@ def player_update(
     dt: float,
     action_buffer: t.InputBuffer,
     mouse_buffer: t.InputBuffer,
-    grid_collision: set[tuple[int, int]],
-    walls: list[pygame.Rect],
+    collision_mesh: CollisionMesh,
+    wall_grid: SpatialGrid,
     dialogue: DialogueSystem,
 ) -> None:
 
@@ -267,7 +329,7 @@ def player_update(
         )
 
     # collision
-    _player_collision(player, dt, grid_collision, walls)
+    _player_collision(player, dt, collision_mesh, wall_grid)
     motion_update(player.motion, dt)
     player.z_velocity += player.z_acceleration * dt
     player.z_position = min(player.z_position + player.z_velocity * dt, 0)
@@ -327,7 +389,7 @@ def player_reset(player: Player) -> None:
     player.progression.activated_buttons = player.progression.checkpoint_buttons.copy()
 
 
-def player_render(player: Player, surface: pygame.Surface, camera: Camera) -> None:
+def player_render(player: Player, queue: RenderQueue, camera: Camera) -> None:
     frame = animator_get_frame(player.animator)
 
     # caught in hole
@@ -344,12 +406,13 @@ def player_render(player: Player, surface: pygame.Surface, camera: Camera) -> No
                 -angle_from_direction(player.direction)
             )
             render_position.y += px * 0.5
-            surface.blit(scaled_frame, camera_to_screen_shake(camera, *render_position))
+            render_queue_blit(queue, scaled_frame, camera_to_screen_shake(camera, *render_position))
             return
 
     # normal rendering
-    render_shadow(surface, camera, player.motion, player.direction, player.z_position)
-    surface.blit(
+    render_shadow(queue, camera, player.motion, player.direction, player.z_position)
+    render_queue_blit(
+        queue,
         frame,
         camera_to_screen_shake(
             camera, player.motion.position.x, player.motion.position.y + player.z_position
@@ -1,11 +1,22 @@
+from collections import OrderedDict
 from dataclasses import dataclass
-from math import pi, radians, sin
+from math import atan2, ceil, cos, degrees, inf, pi, radians, sin
 import pygame
 from pygame import gfxdraw
 
 import core.constants as c
 from utilities.math import point_in_circle
-from components.camera import Camera, camera_to_screen_shake
+from components.camera import Camera, camera_rect, camera_to_screen_shake
+from components.distance import DistanceField, distance_field_raycast
+from components.render import RenderQueue, render_queue_blit
+
+# rasterised sight cones are cached, so static cameras and idle patrols cost one blit a frame.
+# this should comfortably hold every cone on screen at once. if it doesn't, cones evicted while
+# their blit is still queued are kept aside until sight_raster_cache_release
+SIGHT_CACHE_BUDGET = 8 * 1024 * 1024  # bytes
+SIGHT_FACING_STEP = 0.25  # degrees, a quarter degree is under half a pixel at the cone's edge
+SIGHT_DEPTH_PRECISION = 3  # decimal places
+SIGHT_POOL_BATCH = 4  # scratch surfaces allocated at once, and the most kept spare per size
 
 
 @dataclass
@@ -20,9 +31,33 @@ class SightData:
     # compiled data
     compiled: bool = False
     collision_depths: list[float] = None
-    render_segs: list[tuple[int, int]] = None
+    ray_start: float = 0  # angle of the first ray, the rest are evenly spaced after it
+    ray_step: float = 0  # angle between rays
+    render_segs: list[tuple[int, int]] = None  # made from the rest when the cone is drawn
+
+
+# compiled cones by pixel position and quantised facing, for sights that keep covering the same
+# ground (cameras swivelling in place, patrols walking a loop). entries are
+# (collision_depths, ray_start, ray_step)
+@dataclass
+class SightTable:
+    entries: dict[tuple[int, int, int], tuple[list[float], float, float]] = None
+
+
+@dataclass
+class SightRasterCache:
+    entries: OrderedDict = None  # key -> surface, least recently used first
+    pool: dict[tuple[int, int], list[pygame.Surface]] = None  # free surfaces by size
+    used_bytes: int = 0
+    evicted: list[pygame.Surface] = None  # since the last release, they could still be queued
 
 
+_raster_cache = SightRasterCache(OrderedDict(), {}, 0, [])
+
+
+# walks the cells the ray passes through in order (amanatides & woo), so each one is looked up
+# once and the hit fraction is where the ray enters the cell. steps is only used to keep the
+# start_step skip the same
 def _grid_raycast(
     vec: pygame.Vector2,
     center: pygame.Vector2,
@@ -30,78 +65,223 @@ def _grid_raycast(
     steps: int,
     start_step: int,
 ) -> float:
-    for i in range(min(start_step, steps), steps):
-        percent = float(i) / steps
-        ray = vec * percent
-        x = int((ray.x + center.x) // c.TILE_SIZE)
-        y = int((ray.y + center.y) // c.TILE_SIZE)
-        if (x, y) in grid_collision:
-            return percent
-    return 1
+    t = float(min(start_step, steps)) / steps
+    if t >= 1:
+        return 1
+    cell_x = int((center.x + vec.x * t) // c.TILE_SIZE)
+    cell_y = int((center.y + vec.y * t) // c.TILE_SIZE)
+    # how far along the ray the next cell boundary is on each axis, and the distance between them
+    if vec.x > 0:
+        step_x, t_delta_x = 1, c.TILE_SIZE / vec.x
+        t_max_x = ((cell_x + 1) * c.TILE_SIZE - center.x) / vec.x
+    elif vec.x < 0:
+        step_x, t_delta_x = -1, -c.TILE_SIZE / vec.x
+        t_max_x = (cell_x * c.TILE_SIZE - center.x) / vec.x
+    else:
+        step_x, t_delta_x, t_max_x = 0, inf, inf
+    if vec.y > 0:
+        step_y, t_delta_y = 1, c.TILE_SIZE / vec.y
+        t_max_y = ((cell_y + 1) * c.TILE_SIZE - center.y) / vec.y
+    elif vec.y < 0:
+        step_y, t_delta_y = -1, -c.TILE_SIZE / vec.y
+        t_max_y = (cell_y * c.TILE_SIZE - center.y) / vec.y
+    else:
+        step_y, t_delta_y, t_max_y = 0, inf, inf
+    while True:
+        if (cell_x, cell_y) in grid_collision:
+            return t
+        if t_max_x < t_max_y:
+            t = t_max_x
+            t_max_x += t_delta_x
+            cell_x += step_x
+        else:
+            t = t_max_y
+            t_max_y += t_delta_y
+            cell_y += step_y
+        if t >= 1:
+            return 1
 
 
-def sight_compile(data: SightData, grid_collision: set[tuple[int, int]] = None) -> None:
-    assert data.center is not None
+# how the cone is cast: the ray count, steps along each ray, and the step rays start from
+def _sight_steps(data: SightData) -> tuple[int, int, int]:
     # fwiw, this is relatively cheap. my computer can handle almost 200 steps without lag
     # so, as long as there isn't an excessive amount of raycasting entities on screen at once, it's fine
     segs = int(pi / 360 * data.radius * data.angle)
     steps = int(data.radius / 4)
     # strategically ignore some collision at the start
     start_step = int((data.z_offset * sin(radians(data.facing)) - data.z_offset) / 4) + 2
-    offset_center = data.center + pygame.Vector2(0, data.z_offset)
-    data.collision_depths = []
-    data.render_segs = [(data.radius, data.radius + data.z_offset)]
+    return segs, steps, start_step
+
+
+# each ray of the cone from its offset centre, first to last
+def _sight_rays(data: SightData, segs: int) -> list[pygame.Vector2]:
+    rays = []
     for i in range(segs):
         percent = float(i) / (segs - 1)
         sight = pygame.Vector2(data.radius, 0).rotate(-data.facing + data.angle * (percent - 0.5))
         sight.y -= data.z_offset
-        if grid_collision is not None:
-            depth = _grid_raycast(sight, offset_center, grid_collision, steps, start_step)
-        else:
+        rays.append(sight)
+    return rays
+
+
+# grid_distance lets rays skip across open space, it must match grid_collision
+def sight_compile(
+    data: SightData,
+    grid_collision: set[tuple[int, int]] = None,
+    grid_distance: DistanceField = None,
+) -> None:
+    assert data.center is not None
+    segs, steps, start_step = _sight_steps(data)
+    offset_center = data.center + pygame.Vector2(0, data.z_offset)
+    data.ray_start = -data.facing - data.angle * 0.5
+    data.ray_step = float(data.angle) / (segs - 1)
+    data.render_segs = None
+    data.collision_depths = []
+    for sight in _sight_rays(data, segs):
+        if grid_collision is None:
             depth = 1
+        elif grid_distance is not None:
+            start = float(min(start_step, steps)) / steps
+            depth = distance_field_raycast(grid_distance, offset_center, sight, start)
+        else:
+            depth = _grid_raycast(sight, offset_center, grid_collision, steps, start_step)
         data.collision_depths.append(depth)
-        sight *= depth
-        sight.y += data.z_offset
-        data.render_segs.append((data.radius + sight.x, data.radius + sight.y))
     data.compiled = True
 
 
+# outline of the compiled cone, relative to the top left of its raster
+def _sight_render_segs(data: SightData) -> list[tuple[float, float]]:
+    segs = [(data.radius, data.radius + data.z_offset)]
+    for i, depth in enumerate(data.collision_depths):
+        theta = radians(data.ray_start + data.ray_step * i)
+        x = data.radius * cos(theta)
+        y = data.radius * sin(theta) - data.z_offset
+        segs.append((data.radius + x * depth, data.radius + y * depth + data.z_offset))
+    return segs
+
+
+# area whose collision can change a cone
+def sight_rect(data: SightData) -> pygame.Rect:
+    reach = data.radius + abs(data.z_offset)
+    return pygame.Rect(data.center.x - reach, data.center.y - reach, reach * 2, reach * 2)
+
+
+# whether a cone could see point, cones only need compiling for collision when this is true
+def sight_in_range(data: SightData, point: pygame.Vector2) -> bool:
+    return point_in_circle(*point, *data.center, data.radius)
+
+
+# whether a cone could be on screen, cones only need compiling for rendering when this is true
+def sight_on_screen(data: SightData, camera: Camera) -> bool:
+    # screenshake can pull it in from a little way off screen
+    view = camera_rect(camera).inflate(c.TILE_SIZE * 4, c.TILE_SIZE * 4)
+    return view.colliderect(sight_rect(data))
+
+
+def sight_table_initialise(table: SightTable) -> None:
+    table.entries = {}
+
+
+# call when collision within reach of any position the cone has been compiled at changes
+def sight_table_clear(table: SightTable) -> None:
+    table.entries.clear()
+
+
+# sight_compile, snapped to the nearest pixel and SIGHT_FACING_STEP and only done once for each
+def sight_table_compile(
+    table: SightTable,
+    data: SightData,
+    grid_collision: set[tuple[int, int]] = None,
+    grid_distance: DistanceField = None,
+) -> None:
+    key = (round(data.center.x), round(data.center.y), round(data.facing / SIGHT_FACING_STEP))
+    data.center = pygame.Vector2(key[0], key[1])
+    data.facing = key[2] * SIGHT_FACING_STEP
+    entry = table.entries.get(key)
+    if entry is None:
+        sight_compile(data, grid_collision, grid_distance)
+        table.entries[key] = (data.collision_depths, data.ray_start, data.ray_step)
+    else:
+        data.collision_depths, data.ray_start, data.ray_step = entry
+        data.render_segs = None
+        data.compiled = True
+
+
 def sight_collides(data: SightData, point: pygame.Vector2) -> bool:
     if data.collision_depths is None:
         return
-    if not point_in_circle(*point, *data.center, data.radius):
+    if not sight_in_range(data, point):
         return False
     dist = point - data.center
-    nearest = None
-    steps = len(data.collision_depths) - 1
-    for i, depth in enumerate(data.collision_depths):
-        percent = float(i) / steps
-        theta = -data.facing + data.angle * (percent - 0.5)
-        delta = dist.angle_to(pygame.Vector2(1, 0).rotate(theta)) % 360
-        if delta > 180:
-            delta -= 360
-        # spent half an hour debugging because i forgot an abs here
-        if nearest is None or abs(delta) < abs(nearest[2]):
-            nearest = (i, depth, delta)
-    if nearest is not None:
-        if (
-            abs(nearest[2]) <= float(data.angle) / steps
-            and dist.magnitude() < data.radius * nearest[1] - 1
-        ):
-            return True
-    return False
+    # angle of the point past the first ray, wrapped so the cone's middle is the centre
+    last = len(data.collision_depths) - 1
+    half = data.ray_step * last * 0.5
+    delta = (degrees(atan2(dist.y, dist.x)) - data.ray_start - half + 180) % 360 - 180 + half
+    # nearest ray, rounding halfway points down to the earlier one
+    i = min(max(ceil(delta / data.ray_step - 0.5), 0), last)
+    return (
+        abs(delta - i * data.ray_step) <= data.ray_step
+        and dist.magnitude() < data.radius * data.collision_depths[i] - 1
+    )
+
+
+def _sight_raster_key(data: SightData, color: pygame.Color) -> tuple:
+    return (
+        data.radius,
+        data.angle,
+        data.z_offset,
+        round(data.facing / SIGHT_FACING_STEP),
+        tuple(round(depth, SIGHT_DEPTH_PRECISION) for depth in data.collision_depths),
+        tuple(color),
+    )
+
+
+def _sight_raster_surface(size: tuple[int, int]) -> pygame.Surface:
+    cache = _raster_cache
+    free = cache.pool.setdefault(size, [])
+    if len(free) == 0:
+        free.extend(pygame.Surface(size, pygame.SRCALPHA) for _ in range(SIGHT_POOL_BATCH))
+    surf = free.pop()
+    surf.fill((0, 0, 0, 0))
+    cache.used_bytes += size[0] * size[1] * 4
+    while cache.used_bytes > SIGHT_CACHE_BUDGET and len(cache.entries) > 0:
+        _, old = cache.entries.popitem(last=False)
+        cache.used_bytes -= old.get_width() * old.get_height() * 4
+        cache.evicted.append(old)
+    return surf
+
+
+# call once the cones queued this frame have been blitted, so surfaces evicted since the last
+# call can be drawn over again
+def sight_raster_cache_release() -> None:
+    cache = _raster_cache
+    for old in cache.evicted:
+        # keep a few spare surfaces of each size around, let the rest be freed
+        free = cache.pool.setdefault(old.get_size(), [])
+        if len(free) < SIGHT_POOL_BATCH:
+            free.append(old)
+    cache.evicted.clear()
 
 
 def sight_render(
-    surface: pygame.Surface, camera: Camera, data: SightData, color: pygame.Color = (64, 64, 64)
+    queue: RenderQueue, camera: Camera, data: SightData, color: pygame.Color = (64, 64, 64)
 ) -> None:
-    if data.render_segs is None:
+    if data.collision_depths is None or not sight_on_screen(data, camera):
         return
-    sight_surf = pygame.Surface((data.radius * 2, data.radius * 2), pygame.SRCALPHA)
-    if not c.IS_WEB:
-        gfxdraw.aapolygon(sight_surf, data.render_segs, color)
-    pygame.draw.polygon(sight_surf, color, data.render_segs)
-    surface.blit(
+    key = _sight_raster_key(data, color)
+    sight_surf = _raster_cache.entries.get(key)
+    if sight_surf is None:
+        if data.render_segs is None:
+            data.render_segs = _sight_render_segs(data)
+        sight_surf = _sight_raster_surface((int(data.radius * 2), int(data.radius * 2)))
+        if not c.IS_WEB:
+            gfxdraw.aapolygon(sight_surf, data.render_segs, color)
+        pygame.draw.polygon(sight_surf, color, data.render_segs)
+        _raster_cache.entries[key] = sight_surf
+    else:
+        _raster_cache.entries.move_to_end(key)
+    render_queue_blit(
+        queue,
         sight_surf,
         camera_to_screen_shake(
             camera,
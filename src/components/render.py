@@ -0,0 +1,36 @@
+from dataclasses import dataclass
+import pygame
+
+
+# blits are queued up and sent to pygame in one go, rather than crossing into C for each one
+@dataclass(slots=True)
+class RenderQueue:
+    surface: pygame.Surface = None
+    commands: list[tuple] = None  # (source, dest, area, special_flags)
+
+
+def render_queue_initialise(queue: RenderQueue, surface: pygame.Surface) -> None:
+    queue.surface = surface
+    queue.commands = []
+
+
+def render_queue_blit(
+    queue: RenderQueue,
+    source: pygame.Surface,
+    dest: tuple[int, int],
+    area: pygame.Rect | tuple[int, int, int, int] = None,
+    special_flags: int = 0,
+) -> None:
+    queue.commands.append((source, dest, area, special_flags))
+
+
+def render_queue_flush(queue: RenderQueue) -> None:
+    if len(queue.commands) > 0:
+        queue.surface.blits(queue.commands, doreturn=False)
+        queue.commands.clear()
+
+
+# use this for anything that draws directly (pygame.draw etc) so it lands in the right order
+def render_queue_surface(queue: RenderQueue) -> pygame.Surface:
+    render_queue_flush(queue)
+    return queue.surface
@@ -0,0 +1,110 @@
+from dataclasses import dataclass
+from typing import Any
+import pygame
+
+import core.constants as c
+
+SPATIAL_CELL_SIZE = c.TILE_SIZE * 8
+
+
+# uniform grid of buckets so area queries only look at what's nearby.
+# items are tracked by identity and come back out in the order they were first inserted,
+# which keeps render order the same as the list they came from
+@dataclass
+class SpatialGrid:
+    cell_size: int = SPATIAL_CELL_SIZE
+    cells: dict[tuple[int, int], set[int]] = None  # cell -> ids of items touching it
+    items: dict[int, tuple[Any, pygame.Rect, int]] = None  # id -> (item, rect, order)
+    next_order: int = 0
+
+
+# first and last cell the rect touches on each axis
+def _spatial_grid_bounds(grid: SpatialGrid, rect: pygame.Rect) -> tuple[int, int, int, int]:
+    # rects with no size still occupy the cell they're in, and negative sizes cover the same
+    # area as they do for colliderect
+    x0, x1 = (rect.left, rect.right) if rect.w >= 0 else (rect.right, rect.left)
+    y0, y1 = (rect.top, rect.bottom) if rect.h >= 0 else (rect.bottom, rect.top)
+    left, top = x0 // grid.cell_size, y0 // grid.cell_size
+    right = max(x1 - 1, x0) // grid.cell_size
+    bottom = max(y1 - 1, y0) // grid.cell_size
+    return left, top, right, bottom
+
+
+def _spatial_grid_cells(grid: SpatialGrid, rect: pygame.Rect) -> list[tuple[int, int]]:
+    left, top, right, bottom = _spatial_grid_bounds(grid, rect)
+    return [(x, y) for y in range(top, bottom + 1) for x in range(left, right + 1)]
+
+
+def spatial_grid_initialise(grid: SpatialGrid, cell_size: int = SPATIAL_CELL_SIZE) -> None:
+    grid.cell_size = cell_size
+    grid.cells = {}
+    grid.items = {}
+    grid.next_order = 0
+
+
+def spatial_grid_insert(grid: SpatialGrid, item: Any, rect: pygame.Rect) -> None:
+    order = grid.next_order
+    if id(item) in grid.items:
+        order = grid.items[id(item)][2]
+        spatial_grid_remove(grid, item)
+    else:
+        grid.next_order += 1
+    rect = pygame.Rect(rect)
+    grid.items[id(item)] = (item, rect, order)
+    for cell in _spatial_grid_cells(grid, rect):
+        grid.cells.setdefault(cell, set()).add(id(item))
+
+
+def spatial_grid_remove(grid: SpatialGrid, item: Any) -> None:
+    entry = grid.items.pop(id(item), None)
+    if entry is None:
+        return
+    for cell in _spatial_grid_cells(grid, entry[1]):
+        bucket = grid.cells.get(cell)
+        if bucket is not None:
+            bucket.discard(id(item))
+            if len(bucket) == 0:
+                grid.cells.pop(cell)
+
+
+# call after an item moves or resizes, it keeps its original order
+def spatial_grid_move(grid: SpatialGrid, item: Any, rect: pygame.Rect) -> None:
+    entry = grid.items.get(id(item))
+    if entry is not None and entry[1] == rect:
+        return
+    spatial_grid_insert(grid, item, rect)
+
+
+# swaps one item for another in the same order slot, for items that get rebuilt rather than moved
+def spatial_grid_replace(grid: SpatialGrid, old: Any, new: Any, rect: pygame.Rect) -> None:
+    entry = grid.items.get(id(old))
+    if entry is None:
+        spatial_grid_insert(grid, new, rect)
+        return
+    spatial_grid_remove(grid, old)
+    rect = pygame.Rect(rect)
+    grid.items[id(new)] = (new, rect, entry[2])
+    for cell in _spatial_grid_cells(grid, rect):
+        grid.cells.setdefault(cell, set()).add(id(new))
+
+
+# items whose rect overlaps the given rect, in insertion order
+def spatial_grid_query(grid: SpatialGrid, rect: pygame.Rect) -> list[Any]:
+    left, top, right, bottom = _spatial_grid_bounds(grid, rect)
+    # small rects (the player, most decor) usually sit in one cell, and often an empty one
+    if left == right and top == bottom:
+        found = grid.cells.get((left, top))
+        if found is None:
+            return []
+    else:
+        found = set()
+        for y in range(top, bottom + 1):
+            for x in range(left, right + 1):
+                bucket = grid.cells.get((x, y))
+                if bucket is not None:
+                    found.update(bucket)
+    entries = [grid.items[item_id] for item_id in found]
+    entries = [entry for entry in entries if rect.colliderect(entry[1])]
+    if len(entries) > 1:
+        entries.sort(key=lambda entry: entry[2])
+    return [entry[0] for entry in entries]
@@ -0,0 +1,211 @@
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+import pygame
+
+import core.assets as a
+import core.constants as c
+from components.camera import Camera, camera_to_screen_shake
+from components.render import RenderQueue, render_queue_blit
+from components.tile import TileData
+
+# background tiles (render_z < 0) are kept drawn on a back-buffer that covers the screen with
+# a tile of margin on each side. when the camera leaves it, it's scrolled by whole tiles and
+# only the newly exposed rows and columns are drawn. raised tiles are indexed by row and
+# terrain cutoff so splitting them around the player is just a bisect per row
+BUFFER_MARGIN = 1  # tiles on each side past what can be on screen
+
+
+# raised tiles (render_z >= 0) in one grid row that share the same terrain cutoff
+@dataclass(slots=True)
+class RaisedTileGroup:
+    cutoff: float = 0  # the player is drawn over these once their terrain cutoff passes this
+    xs: list[int] = None  # sorted grid x of each tile, for slicing to the screen
+    tiles: list[tuple[int, int, TileData]] = None
+
+
+@dataclass(slots=True)
+class RaisedTileRow:
+    cutoffs: list[float] = None  # ascending, one per group
+    groups: list[RaisedTileGroup] = None
+    # cells (grid x -> tiles) whose render_z goes down somewhere in their list. grouping them
+    # by cutoff would change the order they're drawn in, so they're split tile by tile
+    unsorted: dict[int, list[tuple[int, int, TileData]]] = None
+
+
+@dataclass
+class TerrainCache:
+    buffer: pygame.Surface = None
+    buffer_origin: tuple[int, int] = None  # grid position of the buffer's top left tile
+    buffer_fill: tuple[int, ...] = None  # colour behind the tiles, e.g. the editor's grey
+    raised_rows: dict[int, RaisedTileRow] = None  # grid y -> raised tiles in that row
+
+
+def _draw_buffer_region(
+    cache: TerrainCache,
+    grid_tiles: dict[tuple[int, int], list[TileData]],
+    left: int,
+    top: int,
+    w: int,
+    h: int,
+) -> None:
+    ox, oy = cache.buffer_origin
+    cache.buffer.fill(
+        cache.buffer_fill,
+        ((left - ox) * c.TILE_SIZE, (top - oy) * c.TILE_SIZE, w * c.TILE_SIZE, h * c.TILE_SIZE),
+    )
+    commands = []
+    for y in range(top, top + h):
+        for x in range(left, left + w):
+            for tile in grid_tiles.get((x, y), []):
+                if tile.render_z < 0:
+                    commands.append(
+                        (
+                            a.TERRAIN,
+                            ((x - ox) * c.TILE_SIZE, (y - oy) * c.TILE_SIZE),
+                            (tile.x * c.TILE_SIZE, tile.y * c.TILE_SIZE, c.TILE_SIZE, c.TILE_SIZE),
+                        )
+                    )
+    cache.buffer.blits(commands, doreturn=False)
+
+
+def _raised_cutoff(y: int, tile: TileData) -> float:
+    return (y + tile.render_z + 1) * c.TILE_SIZE
+
+
+# tiles must be listed in the order each cell draws them
+def _build_raised_row(tiles: list[tuple[int, int, TileData]]) -> RaisedTileRow:
+    cells: dict[int, list[tuple[int, int, TileData]]] = {}
+    for entry in tiles:
+        cells.setdefault(entry[0], []).append(entry)
+    # tiles only ever cover their own cell, so drawing order only matters within a cell.
+    # drawing groups in cutoff order keeps it for cells whose cutoffs never go down
+    groups: dict[float, RaisedTileGroup] = {}
+    unsorted = {}
+    for x in sorted(cells):
+        cell = cells[x]
+        cutoffs = [_raised_cutoff(y, tile) for _, y, tile in cell]
+        if any(cutoff > after for cutoff, after in zip(cutoffs, cutoffs[1:])):
+            unsorted[x] = cell
+            continue
+        for entry, cutoff in zip(cell, cutoffs):
+            if cutoff not in groups:
+                groups[cutoff] = RaisedTileGroup(cutoff, [], [])
+            groups[cutoff].xs.append(x)
+            groups[cutoff].tiles.append(entry)
+    cutoffs = sorted(groups)
+    return RaisedTileRow(cutoffs, [groups[cutoff] for cutoff in cutoffs], unsorted)
+
+
+def terrain_cache_initialise(cache: TerrainCache) -> None:
+    cache.buffer = None
+    cache.buffer_origin = None
+    cache.raised_rows = {}
+
+
+# call whenever the tiles at (grid_x, grid_y) change
+def terrain_cache_invalidate(
+    cache: TerrainCache,
+    grid_tiles: dict[tuple[int, int], list[TileData]],
+    grid_x: int,
+    grid_y: int,
+) -> None:
+    if cache.buffer_origin is not None:
+        ox, oy = cache.buffer_origin
+        cols = cache.buffer.get_width() // c.TILE_SIZE
+        rows = cache.buffer.get_height() // c.TILE_SIZE
+        if ox <= grid_x < ox + cols and oy <= grid_y < oy + rows:
+            _draw_buffer_region(cache, grid_tiles, grid_x, grid_y, 1, 1)
+    row = cache.raised_rows.pop(grid_y, None)
+    tiles = []
+    if row is not None:
+        tiles = [entry for g in row.groups for entry in g.tiles]
+        tiles += [entry for cell in row.unsorted.values() for entry in cell]
+    tiles = [entry for entry in tiles if entry[0] != grid_x]
+    tiles += [(grid_x, grid_y, tile) for tile in grid_tiles.get((grid_x, grid_y), [])]
+    tiles = [entry for entry in tiles if entry[2].render_z >= 0]
+    if len(tiles) > 0:
+        cache.raised_rows[grid_y] = _build_raised_row(tiles)
+
+
+# call whenever grid_tiles is replaced or changed in bulk
+def terrain_cache_rebuild(
+    cache: TerrainCache, grid_tiles: dict[tuple[int, int], list[TileData]]
+) -> None:
+    cache.buffer_origin = None
+    rows: dict[int, list[tuple[int, int, TileData]]] = {}
+    for (x, y), tiles in grid_tiles.items():
+        for tile in tiles:
+            if tile.render_z >= 0:
+                rows.setdefault(y, []).append((x, y, tile))
+    cache.raised_rows = {y: _build_raised_row(tiles) for y, tiles in rows.items()}
+
+
+# splits the raised tiles within tile_bounds (in grid coordinates, inclusive) into runs that
+# are behind and in front of something standing at terrain_cutoff
+def terrain_cache_split_raised(
+    cache: TerrainCache, tile_bounds: pygame.Rect, terrain_cutoff: float
+) -> tuple[list[list[tuple[int, int, TileData]]], list[list[tuple[int, int, TileData]]]]:
+    bg_runs, fg_runs = [], []
+    for y in range(tile_bounds.top, tile_bounds.bottom + 1):
+        row = cache.raised_rows.get(y)
+        if row is None:
+            continue
+        split = bisect_left(row.cutoffs, terrain_cutoff)
+        for i, group in enumerate(row.groups):
+            lo = bisect_left(group.xs, tile_bounds.left)
+            hi = bisect_right(group.xs, tile_bounds.right)
+            if lo < hi:
+                (bg_runs if i < split else fg_runs).append(group.tiles[lo:hi])
+        for x, cell in row.unsorted.items():
+            if tile_bounds.left <= x <= tile_bounds.right:
+                bg_runs.append([e for e in cell if _raised_cutoff(e[1], e[2]) < terrain_cutoff])
+                fg_runs.append([e for e in cell if _raised_cutoff(e[1], e[2]) >= terrain_cutoff])
+    return bg_runs, fg_runs
+
+
+# renders every background tile overlapping tile_bounds (in grid coordinates, inclusive)
+def terrain_cache_render(
+    cache: TerrainCache,
+    queue: RenderQueue,
+    camera: Camera,
+    grid_tiles: dict[tuple[int, int], list[TileData]],
+    tile_bounds: pygame.Rect,
+    fill: tuple[int, ...],
+) -> None:
+    cols, rows = tile_bounds.w + 1 + BUFFER_MARGIN * 2, tile_bounds.h + 1 + BUFFER_MARGIN * 2
+    if cache.buffer is None or cache.buffer.get_size() != (cols * c.TILE_SIZE, rows * c.TILE_SIZE):
+        cache.buffer = pygame.Surface((cols * c.TILE_SIZE, rows * c.TILE_SIZE)).convert()
+        cache.buffer_origin = None
+    if cache.buffer_fill != fill:
+        cache.buffer_fill = fill
+        cache.buffer_origin = None
+
+    old = cache.buffer_origin
+    if (
+        old is None
+        or tile_bounds.left < old[0]
+        or tile_bounds.top < old[1]
+        or tile_bounds.right >= old[0] + cols
+        or tile_bounds.bottom >= old[1] + rows
+    ):
+        # recentre on the screen
+        ox, oy = tile_bounds.left - BUFFER_MARGIN, tile_bounds.top - BUFFER_MARGIN
+        cache.buffer_origin = (ox, oy)
+        if old is None or abs(ox - old[0]) >= cols or abs(oy - old[1]) >= rows:
+            _draw_buffer_region(cache, grid_tiles, ox, oy, cols, rows)
+        else:
+            dx, dy = ox - old[0], oy - old[1]
+            cache.buffer.scroll(-dx * c.TILE_SIZE, -dy * c.TILE_SIZE)
+            if dx > 0:
+                _draw_buffer_region(cache, grid_tiles, ox + cols - dx, oy, dx, rows)
+            elif dx < 0:
+                _draw_buffer_region(cache, grid_tiles, ox, oy, -dx, rows)
+            if dy > 0:
+                _draw_buffer_region(cache, grid_tiles, ox, oy + rows - dy, cols, dy)
+            elif dy < 0:
+                _draw_buffer_region(cache, grid_tiles, ox, oy, cols, -dy)
+
+    ox, oy = cache.buffer_origin
+    render_queue_blit(
+        queue, cache.buffer, camera_to_screen_shake(camera, ox * c.TILE_SIZE, oy * c.TILE_SIZE)
+    )
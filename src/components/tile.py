@@ -5,6 +5,8 @@ import pygame
 import core.constants as c
 import core.assets as a
 from components.camera import Camera, camera_to_screen_shake
+from components.render import RenderQueue, render_queue_blit
+from components.spatial import SpatialGrid, spatial_grid_initialise, spatial_grid_insert
 
 
 @dataclass(slots=True)
@@ -20,20 +22,15 @@ class TileData:
         return TileData(*self)  # satisfying
 
 
-def grid_collision_rect(grid_collision: set[tuple[int, int]], x: int, y: int) -> pygame.Rect | None:
-    if (x, y) not in grid_collision:
-        return None
-    return pygame.Rect(x * c.TILE_SIZE, y * c.TILE_SIZE, c.TILE_SIZE, c.TILE_SIZE)
-
-
 def tile_render(
-    surface: pygame.Surface,
+    queue: RenderQueue,
     camera: Camera,
     grid_x: float,
     grid_y: float,
     tile: TileData,
 ) -> None:
-    surface.blit(
+    render_queue_blit(
+        queue,
         a.TERRAIN,
         camera_to_screen_shake(camera, grid_x * c.TILE_SIZE, grid_y * c.TILE_SIZE),
         (tile.x * c.TILE_SIZE, tile.y * c.TILE_SIZE, c.TILE_SIZE, c.TILE_SIZE),
@@ -64,6 +61,12 @@ def tile_render_hitbox(
     )
 
 
+def wall_grid_build(grid: SpatialGrid, walls: list[pygame.Rect]) -> None:
+    spatial_grid_initialise(grid)
+    for wall in walls:
+        spatial_grid_insert(grid, wall, wall)
+
+
 def wall_render(
     surface: pygame.Surface, camera: Camera, index: Any | None, wall: pygame.Rect
 ) -> None:
@@ -49,3 +49,31 @@ def stopwatch_update(stopwatch: Stopwatch, dt: float) -> None:
 def stopwatch_reset(stopwatch: Stopwatch, bindings: dict[int, Callable] = None) -> None:
     stopwatch.elapsed = 0
     stopwatch.bindings = bindings
+
+
+# splits frames of any length into steps of the same length, time left over carries into the
+# next frame so nothing is lost
+@dataclass
+class FixedTimestep:
+    step: float = 0
+    accumulator: float = 0
+
+
+def fixed_timestep_reset(timestep: FixedTimestep, step: float) -> None:
+    timestep.step = step
+    timestep.accumulator = 0
+
+
+# returns how many steps a frame dt long adds up to, which can be none
+def fixed_timestep_update(timestep: FixedTimestep, dt: float) -> int:
+    timestep.accumulator += dt
+    steps = 0
+    while timestep.accumulator >= timestep.step:
+        timestep.accumulator -= timestep.step
+        steps += 1
+    return steps
+
+
+# how far it is from the last step to the next one, from 0 to 1
+def fixed_timestep_alpha(timestep: FixedTimestep) -> float:
+    return timestep.accumulator / timestep.step
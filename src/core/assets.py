@@ -1,5 +1,6 @@
 import pygame
 
+import core.constants as c
 from utilities.sprite import slice_sheet
 
 
@@ -45,6 +46,17 @@ DECOR = (
     ]
 )
 
+
+def _generate_faded(frames: list[pygame.Surface], alpha: int) -> list[pygame.Surface]:
+    faded = [frame.copy() for frame in frames]
+    for frame in faded:
+        frame.set_alpha(alpha)
+    return faded
+
+
+# decor drawn over the player is see-through, same indices as DECOR
+DECOR_FADED = [_generate_faded(frames, 96) for frames in DECOR]
+
 # menu
 MENU = "assets/menu/"
 MENU_BACK = pygame.image.load(MENU + "menu_back.png")
@@ -78,6 +90,27 @@ MENU_CONTROLS = pygame.Surface((256, 64), pygame.SRCALPHA)
 _generate_controls()
 
 
+# PROCEDURAL (drawn once here so render paths only ever blit them)
+
+
+def _generate_ellipse(w: int, h: int, color: tuple[int, ...]) -> pygame.Surface:
+    sprite = pygame.Surface((w, h), pygame.SRCALPHA)
+    pygame.draw.ellipse(sprite, color, sprite.get_rect())
+    return sprite
+
+
+# walking entity shadows by size: standing, widened while moving sideways, and both airborne
+SHADOWS = {
+    (w, h): _generate_ellipse(w, h, (0, 0, 0, 50)) for w, h in ((12, 4), (14, 4), (10, 2), (12, 2))
+}
+# spotlight enemy light, 6 tiles across and squashed by its perspective scale
+SPOTLIGHT = _generate_ellipse(
+    c.SPOTLIGHT_RADIUS * 2,
+    int(c.SPOTLIGHT_RADIUS * c.SPOTLIGHT_PERSPECTIVE_SCALE * 2),
+    (64, 64, 64),
+)
+
+
 # AUDIO (ogg for web compatibility)
 SFX = "assets/sfx/"
 
@@ -4,6 +4,8 @@ import pygame
 # game constants
 TILE_SIZE = 16
 HALF_TILE_SIZE = 8
+SPOTLIGHT_RADIUS = TILE_SIZE * 3  # horizontal radius of the spotlight enemy's light
+SPOTLIGHT_PERSPECTIVE_SCALE = 0.66  # its vertical radius as a fraction of the horizontal one
 
 # Pygame constants
 WINDOW_WIDTH = 32 * TILE_SIZE
@@ -15,7 +17,8 @@ IS_WEB = sys.platform == "emscripten"
 IS_PRODUCTION = IS_WEB
 CAPTION = "BURNER PHONE DX"
 FPS = 0  # 0 = Uncapped -> let VSYNC decide best tick speed if enabled
-MAX_DT = 1 / 60
+MAX_DT = 1 / 30  # player collision is swept, so longer frames can't tunnel through walls
+FIXED_DT = 1 / 120  # length of each game update step, however long frames are
 
 # Colour constants
 WHITE = pygame.Color(255, 255, 255)
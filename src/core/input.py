@@ -45,6 +45,34 @@ def is_nothing(action_buffer: InputBuffer, input_enum: IntEnum) -> bool:
     return action_buffer[input_enum] == InputState.NOTHING
 
 
+# the buffer as the next fixed step sees it, presses and releases only last one step.
+# live is the latest frame's buffer, a press that was let go of before its step ran still
+# needs releasing after it
+def input_buffer_step(buffer: InputBuffer, live: InputBuffer) -> InputBuffer:
+    stepped = []
+    for state, live_state in zip(buffer, live):
+        if state == InputState.PRESSED:
+            down = live_state in (InputState.PRESSED, InputState.HELD)
+            stepped.append(InputState.HELD if down else InputState.RELEASED)
+        elif state == InputState.RELEASED:
+            stepped.append(InputState.NOTHING)
+        else:
+            stepped.append(state)
+    return stepped
+
+
+# a frame can run no steps, its presses and releases are kept in pending until one runs
+def input_buffer_merge(pending: InputBuffer, buffer: InputBuffer) -> InputBuffer:
+    return [
+        (
+            old
+            if old in (InputState.PRESSED, InputState.RELEASED) and new != InputState.PRESSED
+            else new
+        )
+        for old, new in zip(pending, buffer)
+    ]
+
+
 action_mappings = {
     Action.LEFT: [pygame.K_a, pygame.K_LEFT],
     Action.RIGHT: [pygame.K_d, pygame.K_RIGHT],
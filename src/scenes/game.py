@@ -10,6 +10,9 @@ import core.globals as g
 
 from components.audio import AudioChannel, play_sound, stop_music, play_music
 from components.decor import Decor, decor_rect, decor_render
+from components.distance import DistanceField, distance_field_initialise
+from components.hazard import HazardMap, hazard_map_collides, hazard_map_initialise
+from components.mesh import CollisionMesh, collision_mesh_initialise, collision_mesh_query
 from components.entities.camera_boundary import CameraBoundaryEntity
 from components.fade import (
     ScreenFade,
@@ -19,10 +22,22 @@ from components.fade import (
     fade_start,
     fade_update,
 )
-from components.motion import Direction
+from components.motion import (
+    Direction,
+    Motion,
+    MotionInterpolation,
+    motion_interpolation_apply,
+    motion_interpolation_initialise,
+    motion_interpolation_restore,
+    motion_interpolation_snapshot,
+)
 from components.timer import (
+    FixedTimestep,
     Stopwatch,
     Timer,
+    fixed_timestep_alpha,
+    fixed_timestep_reset,
+    fixed_timestep_update,
     stopwatch_reset,
     stopwatch_update,
     timer_reset,
@@ -40,11 +55,24 @@ from components.dialogue import (
     dialogue_update,
 )
 from components.editor import Editor, editor_render, editor_update
-from components.entities.entity import Entity, entity_render, entity_reset, entity_update
+from components.entities.entity import (
+    Entity,
+    EntityDisplayList,
+    EntityTriggers,
+    entity_display_list_build,
+    entity_display_list_initialise,
+    entity_display_list_render,
+    entity_grid_update,
+    entity_reset,
+    entity_triggers_initialise,
+    entity_triggers_update,
+    entity_update,
+)
 from components.player import (
     MainStoryProgress,
     Player,
     PlayerCaughtStyle,
+    player_caught,
     player_reset,
     player_rect,
     player_render_overlays,
@@ -53,7 +81,6 @@ from components.player import (
 )
 from components.tile import (
     TileData,
-    grid_collision_rect,
     tile_render,
     tile_render_hitbox,
     wall_render,
@@ -65,7 +92,16 @@ from components.camera import (
     camera_update,
     camera_reset,
 )
+from components.ray import sight_raster_cache_release
+from components.render import RenderQueue, render_queue_flush, render_queue_initialise
+from components.spatial import SpatialGrid, spatial_grid_initialise, spatial_grid_query
 from components.settings import Settings, settings_update, settings_render, settings_load
+from components.terrain import (
+    TerrainCache,
+    terrain_cache_initialise,
+    terrain_cache_render,
+    terrain_cache_split_raised,
+)
 from components.statemachine import StateMachine, statemachine_change_state
 
 from scenes import scenemapping
@@ -108,12 +144,41 @@ class Game(Scene):
         self.global_stopwatch = Stopwatch()
         self.timers: list[Timer] = []
 
+        self.timestep = FixedTimestep()
+        fixed_timestep_reset(self.timestep, c.FIXED_DT)
+        self.interpolation = MotionInterpolation()
+        motion_interpolation_initialise(self.interpolation)
+        # input as the next step sees it
+        self.step_action_buffer: t.InputBuffer = [t.InputState.NOTHING for _ in t.Action]
+        self.step_mouse_buffer: t.InputBuffer = [t.InputState.NOTHING for _ in t.MouseButton]
+
         self.grid_collision: set[tuple[int, int]] = set()
+        self.grid_distance = DistanceField()
+        distance_field_initialise(self.grid_distance)
+        self.collision_mesh = CollisionMesh()
+        collision_mesh_initialise(self.collision_mesh)
+        self.hazard_map = HazardMap()
+        hazard_map_initialise(self.hazard_map)
         self.grid_tiles: dict[tuple[int, int], list[TileData]] = {}
         self.walls: list[pygame.Rect] = []
         self.entities: list[Entity] = []
         self.decor: list[Decor] = []
 
+        self.terrain_cache = TerrainCache()
+        terrain_cache_initialise(self.terrain_cache)
+        self.render_queue = RenderQueue()
+        render_queue_initialise(self.render_queue, None)
+        self.decor_grid = SpatialGrid()
+        spatial_grid_initialise(self.decor_grid)
+        self.entity_grid = SpatialGrid()
+        spatial_grid_initialise(self.entity_grid)
+        self.wall_grid = SpatialGrid()
+        spatial_grid_initialise(self.wall_grid)
+        self.entity_display_list = EntityDisplayList()
+        entity_display_list_initialise(self.entity_display_list)
+        self.entity_triggers = EntityTriggers()
+        entity_triggers_initialise(self.entity_triggers)
+
         self.editor = Editor(self)
         self.editor.load()
 
@@ -152,6 +217,9 @@ class Game(Scene):
 
         settings_load(self.settings)
 
+        fixed_timestep_reset(self.timestep, c.FIXED_DT)
+        motion_interpolation_snapshot(self.interpolation, _interpolated_motions(self))
+
     # runs when player dies
     def reset(self) -> None:
         camera_reset(self.camera)
@@ -160,6 +228,9 @@ class Game(Scene):
         self.entities_in_bounds: list[Entity] = None
         for entity in self.entities:
             entity_reset(entity)
+            entity_grid_update(self.entity_grid, entity)
+        # reset triggers start over, as if the player just stepped on
+        entity_triggers_initialise(self.entity_triggers)
 
     def execute(
         self,
@@ -168,9 +239,24 @@ class Game(Scene):
         action_buffer: t.InputBuffer,
         mouse_buffer: t.InputBuffer,
     ) -> None:
-
-        # UPDATE
-
+        # the game updates in fixed steps so it plays the same however fast frames are, and
+        # is drawn part way between the last two steps so movement stays smooth
+        self.step_action_buffer = t.input_buffer_merge(self.step_action_buffer, action_buffer)
+        self.step_mouse_buffer = t.input_buffer_merge(self.step_mouse_buffer, mouse_buffer)
+        for _ in range(fixed_timestep_update(self.timestep, dt)):
+            motion_interpolation_snapshot(self.interpolation, _interpolated_motions(self))
+            self.update(self.timestep.step, self.step_action_buffer, self.step_mouse_buffer)
+            self.step_action_buffer = t.input_buffer_step(self.step_action_buffer, action_buffer)
+            self.step_mouse_buffer = t.input_buffer_step(self.step_mouse_buffer, mouse_buffer)
+            # leaving the scene, the rest of the steps belong to the next time it's entered
+            if self.statemachine.next_state is not None:
+                break
+
+        motion_interpolation_apply(self.interpolation, fixed_timestep_alpha(self.timestep))
+        self.render(surface)
+        motion_interpolation_restore(self.interpolation)
+
+    def update(self, dt: float, action_buffer: t.InputBuffer, mouse_buffer: t.InputBuffer) -> None:
         fade_update(self.fade, dt)
 
         if not c.IS_PRODUCTION:
@@ -181,7 +267,7 @@ class Game(Scene):
             self.dialogue, dt, action_buffer, mouse_buffer, self.camera, camera_target
         )
 
-        # update and render entities within this area
+        # update entities within this area
         entity_bounds = camera_rect(self.camera).inflate(c.TILE_SIZE * 12, c.TILE_SIZE * 12)
 
         if not self.paused:
@@ -234,6 +320,8 @@ class Game(Scene):
                     # instantly update the camera to the target so any boundaries don't accidentally get locked on
                     camera_target = _camera_target(self.player)
                     self.camera.motion.position = camera_target
+                    # and draw everything where it's been put back, not sliding there
+                    motion_interpolation_snapshot(self.interpolation, _interpolated_motions(self))
                     for ent in self.entities:
                         if isinstance(ent, CameraBoundaryEntity):
                             entity_update(
@@ -243,6 +331,7 @@ class Game(Scene):
                                 self.player,
                                 self.camera,
                                 self.grid_collision,
+                                self.grid_distance,
                             )
 
                 # player
@@ -252,8 +341,8 @@ class Game(Scene):
                         dt,
                         action_buffer,
                         mouse_buffer,
-                        self.grid_collision,
-                        self.walls,
+                        self.collision_mesh,
+                        self.wall_grid,
                         self.dialogue,
                     )
 
@@ -261,15 +350,22 @@ class Game(Scene):
                 camera_follow(self.camera, *camera_target)
                 camera_update(self.camera, dt)
 
+                # triggers and ground hazards (before entities so everything sees what they did
+                # this frame)
+                entity_triggers_update(
+                    self.entity_triggers, self.entity_grid, self.player, self.camera
+                )
+                if self.player.z_position == 0 and hazard_map_collides(
+                    self.hazard_map, player_rect(self.player.motion)
+                ):
+                    player_caught(self.player, self.camera, PlayerCaughtStyle.HOLE)
+
                 # entities
                 self.entities_in_bounds = []
-                for ent in self.entities:
+                for ent in spatial_grid_query(self.entity_grid, entity_bounds):
+                    # entities without a path are indexed by their hitbox, so they're already in
                     path = ent.get_path()
-                    if path:
-                        ok = any(entity_bounds.collidepoint(point) for point in path)
-                    else:
-                        ok = entity_bounds.colliderect(ent.get_hitbox())
-                    if ok:
+                    if not path or any(entity_bounds.collidepoint(point) for point in path):
                         self.entities_in_bounds.append(ent)
                         entity_update(
                             ent,
@@ -278,7 +374,9 @@ class Game(Scene):
                             self.player,
                             self.camera,
                             self.grid_collision,
+                            self.grid_distance,
                         )
+                        entity_grid_update(self.entity_grid, ent)
 
                 # pausing
                 if not fade_active(self.fade) and t.is_pressed(action_buffer, t.Action.START):
@@ -295,18 +393,18 @@ class Game(Scene):
                 self.paused = False
                 play_sound(AudioChannel.UI, a.UI_HOVER)
 
+    def render(self, surface: pygame.Surface) -> None:
+        # render entities within this area
+        entity_bounds = camera_rect(self.camera).inflate(c.TILE_SIZE * 12, c.TILE_SIZE * 12)
+
         if self.entities_in_bounds is None:
             # compile list of entities for rendering only
             self.entities_in_bounds = [
-                entity for entity in self.entities if entity_bounds.colliderect(entity.get_hitbox())
+                entity
+                for entity in spatial_grid_query(self.entity_grid, entity_bounds)
+                if entity_bounds.colliderect(entity.get_hitbox())
             ]
 
-        # RENDER
-
-        # background
-        if self.editor.enabled:
-            surface.fill(c.GRAY)
-
         entity_cutoff = round(self.player.motion.position.y + 32)
         # for some reason, subtracting the z position looks good
         terrain_cutoff = entity_cutoff - self.player.z_position
@@ -321,85 +419,75 @@ class Game(Scene):
             surface.get_height() // c.TILE_SIZE,
         )
 
+        # world rendering is queued up and flushed once per layer
+        queue = self.render_queue
+        queue.surface = surface
+
         # behind player
-        cutoff_bg_tiles = []
-        cutoff_fg_tiles = []
+        # the terrain back-buffer covers the whole screen, so it doubles as the background
+        terrain_cache_render(
+            self.terrain_cache,
+            queue,
+            self.camera,
+            self.grid_tiles,
+            tile_bounds,
+            c.GRAY if self.editor.enabled else c.BLACK,
+        )
+        cutoff_bg_tiles, cutoff_fg_tiles = terrain_cache_split_raised(
+            self.terrain_cache, tile_bounds, terrain_cutoff
+        )
+        display_list = self.entity_display_list
+        entity_display_list_build(display_list, self.entities_in_bounds, entity_cutoff)
         cutoff_decor = []
-        for y in range(tile_bounds.top, tile_bounds.bottom + 1):
-            for x in range(tile_bounds.left, tile_bounds.right + 1):
-                for tile in self.grid_tiles.get((x, y), []):
-                    if tile.render_z < 0:
-                        tile_render(surface, self.camera, x, y, tile)
-                    elif terrain_cutoff > (y + tile.render_z + 1) * c.TILE_SIZE:
-                        cutoff_bg_tiles.append((x, y, tile))
-                    else:
-                        cutoff_fg_tiles.append((x, y, tile))
-        for ent in self.entities_in_bounds:
-            entity_render(ent, surface, self.camera, RenderLayer.RAYS)
-        for x, y, tile in cutoff_bg_tiles:
-            tile_render(surface, self.camera, x, y, tile)
-        for ent in self.entities_in_bounds:
-            entity_render(
-                ent,
-                surface,
-                self.camera,
-                (
-                    RenderLayer.PLAYER_BG
-                    if ent.get_terrain_cutoff() < entity_cutoff
-                    else RenderLayer.BACKGROUND
-                ),
-            )
-        for dec in self.decor:
+        entity_display_list_render(display_list, queue, self.camera, RenderLayer.RAYS)
+        render_queue_flush(queue)
+        # the cones are all drawn now, any rasters they lost can be reused
+        sight_raster_cache_release()
+        for run in cutoff_bg_tiles:
+            for x, y, tile in run:
+                tile_render(queue, self.camera, x, y, tile)
+        entity_display_list_render(display_list, queue, self.camera, RenderLayer.PLAYER_BG)
+        for dec in spatial_grid_query(self.decor_grid, entity_bounds):
             rect = decor_rect(dec)
-            if entity_bounds.colliderect(rect):
-                if rect.bottom >= entity_cutoff and player_rect(self.player.motion).colliderect(
-                    rect
-                ):
-                    cutoff_decor.append(dec)
-                else:
-                    decor_render(
-                        dec,
-                        surface,
-                        self.camera,
-                        RenderLayer.PLAYER_BG,
-                        self.global_stopwatch.elapsed,
-                    )
+            if rect.bottom >= entity_cutoff and player_rect(self.player.motion).colliderect(rect):
+                cutoff_decor.append(dec)
+            else:
+                decor_render(
+                    dec,
+                    queue,
+                    self.camera,
+                    RenderLayer.PLAYER_BG,
+                    self.global_stopwatch.elapsed,
+                )
+        render_queue_flush(queue)
 
         # player
-        player_render(self.player, surface, self.camera)
+        player_render(self.player, queue, self.camera)
+        render_queue_flush(queue)
 
         # in front of player
         for dec in cutoff_decor:
             decor_render(
                 dec,
-                surface,
+                queue,
                 self.camera,
                 RenderLayer.PLAYER_FG,
                 self.global_stopwatch.elapsed,
             )
-        for x, y, tile in cutoff_fg_tiles:
-            tile_render(surface, self.camera, x, y, tile)
-        for ent in self.entities_in_bounds:
-            entity_render(
-                ent,
-                surface,
-                self.camera,
-                (
-                    RenderLayer.PLAYER_FG
-                    if ent.get_terrain_cutoff() >= entity_cutoff
-                    else RenderLayer.FOREGROUND
-                ),
-            )
+        for run in cutoff_fg_tiles:
+            for x, y, tile in run:
+                tile_render(queue, self.camera, x, y, tile)
+        entity_display_list_render(display_list, queue, self.camera, RenderLayer.LIGHTS)
+        render_queue_flush(queue)
 
         # hitboxes
         if g.show_hitboxes:
             for i, wall in enumerate(self.walls):
                 wall_render(surface, self.camera, i, wall)
+            for crect in collision_mesh_query(self.collision_mesh, tile_bounds):
+                wall_render(surface, self.camera, None, crect)
             for y in range(tile_bounds.top, tile_bounds.bottom + 1):
                 for x in range(tile_bounds.left, tile_bounds.right + 1):
-                    crect = grid_collision_rect(self.grid_collision, x, y)
-                    if crect is not None:
-                        wall_render(surface, self.camera, None, crect)
                     for tile in self.grid_tiles.get((x, y), []):
                         tile_render_hitbox(surface, self.camera, x, y, tile)
 
@@ -473,6 +561,14 @@ class Game(Scene):
                 dialogue_execute_script_scene(self.dialogue, "FINALE FADE OUT DONE")
 
 
+# everything drawn that moves, the entities only while they're near enough to update
+def _interpolated_motions(scene: Game) -> list[Motion]:
+    motions = [scene.player.motion, scene.camera.motion]
+    if scene.entities_in_bounds is not None:
+        motions.extend(entity.motion for entity in scene.entities_in_bounds)
+    return motions
+
+
 def _add_timer(scene: Game, duration: float, callback: Callable) -> Timer:
     timer = Timer()
     timer_reset(timer, duration, callback)
@@ -0,0 +1,93 @@
+import argparse
+import contextlib
+import os
+import sys
+
+# headless, this has to happen before pygame starts up
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+
+# the game prints as it loads, keep stdout for the results
+with contextlib.redirect_stdout(sys.stderr):
+    import core.setup  # noqa: F401 (the window has to exist before assets are converted)
+    import core.input as t
+    from components.statemachine import StateMachine
+    from scenes.scenemapping import SCENE_MAPPING, SceneState
+
+# taps and holds buttons at many refresh rates and checks every fixed step of the game sees
+# each press and release exactly once, in order. exits with 1 if one doesn't.
+# run from src/ like main.py, e.g. python3 timestep_check.py --rates 60 240 480
+
+# frames of each input: a tap is let go of the frame after it's pressed
+TAP = [t.InputState.PRESSED, t.InputState.RELEASED]
+HOLD = [t.InputState.PRESSED] + [t.InputState.HELD] * 8 + [t.InputState.RELEASED]
+
+
+# the states of one action and one mouse button each step saw, given frames of input at rate
+def run_frames(rate: int, frames: list[t.InputState]) -> tuple[list, list]:
+    with contextlib.redirect_stdout(sys.stderr):
+        game = SCENE_MAPPING[SceneState.GAME](StateMachine())
+        game.enter()
+    actions, mouse = [], []
+    update = game.update
+
+    def recording_update(dt: float, action_buffer: t.InputBuffer, mouse_buffer: t.InputBuffer):
+        actions.append(action_buffer[t.Action.B])
+        mouse.append(mouse_buffer[t.MouseButton.LEFT])
+        update(dt, action_buffer, mouse_buffer)
+
+    game.update = recording_update
+    surface = pygame.Surface(pygame.display.get_surface().get_size())
+    # then nothing for long enough that every step still to come has run
+    frames = frames + [t.InputState.NOTHING] * (rate // 30 + 2)
+    for state in frames:
+        action_buffer = [t.InputState.NOTHING for _ in t.Action]
+        mouse_buffer = [t.InputState.NOTHING for _ in t.MouseButton]
+        action_buffer[t.Action.B] = state
+        mouse_buffer[t.MouseButton.LEFT] = state
+        game.execute(surface, 1 / rate, action_buffer, mouse_buffer)
+    return actions, mouse
+
+
+# whether the steps saw one press, then only holds, then one release
+def check_steps(states: list[t.InputState]) -> bool:
+    edges = [state for state in states if state in (t.InputState.PRESSED, t.InputState.RELEASED)]
+    if edges != [t.InputState.PRESSED, t.InputState.RELEASED]:
+        return False
+    pressed = states.index(t.InputState.PRESSED)
+    released = states.index(t.InputState.RELEASED)
+    return all(state == t.InputState.HELD for state in states[pressed + 1 : released])
+
+
+def run(rates: list[int]) -> list[dict]:
+    failures = []
+    for rate in rates:
+        for name, frames in (("tap", TAP), ("hold", HOLD)):
+            for button, states in zip(("action", "mouse"), run_frames(rate, frames)):
+                if not check_steps(states):
+                    failures.append(
+                        {
+                            "rate": rate,
+                            "input": name,
+                            "button": button,
+                            "steps": [state.name for state in states if state != 0],
+                        }
+                    )
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="check fixed steps see every press and release")
+    parser.add_argument(
+        "--rates", type=int, nargs="+", default=[30, 60, 144, 240, 480], help="frames per second"
+    )
+    args = parser.parse_args()
+    failures = run(args.rates)
+    checks = len(args.rates) * 4
+    for failure in failures:
+        print("missed input", failure)
+    print(f"{checks - len(failures)}/{checks} inputs seen")
+    sys.exit(1 if len(failures) > 0 else 0)